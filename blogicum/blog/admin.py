@@ -1,12 +1,36 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 
 from .models import Category, Comment, Location, Post
+from .moderation import delete_comments, deleting_posts, set_published
+from .paginators import LimitedCountPaginator
+from .search import search_posts
 
 
 class BlogAdmin(admin.ModelAdmin):
     """Панель администратора."""
 
     list_editable = ('is_published',)
+    paginator = LimitedCountPaginator
+    show_full_result_count = False
+    actions = ('publish', 'unpublish')
+
+    @admin.action(
+        description='Опубликовать выбранные', permissions=('change',)
+    )
+    def publish(self, request, queryset):
+        count = set_published(queryset, True)
+        self.message_user(
+            request, f'Опубликовано записей: {count}', messages.SUCCESS
+        )
+
+    @admin.action(
+        description='Снять с публикации выбранные', permissions=('change',)
+    )
+    def unpublish(self, request, queryset):
+        count = set_published(queryset, False)
+        self.message_user(
+            request, f'Снято с публикации записей: {count}', messages.SUCCESS
+        )
 
 
 @admin.register(Category)
@@ -19,6 +43,7 @@ class CategoryAdmin(BlogAdmin):
         'created_at',
         'slug',
     )
+    search_fields = ('title',)
 
 
 @admin.register(Post)
@@ -35,6 +60,26 @@ class PostAdmin(BlogAdmin):
         'location',
         'category',
     )
+    list_select_related = ('author', 'location', 'category')
+    list_filter = ('is_published', 'category')
+    search_fields = ('title', 'text')
+    date_hierarchy = 'pub_date'
+    autocomplete_fields = ('author', 'location', 'category')
+
+    def get_search_results(self, request, queryset, search_term):
+        # Тот же полнотекстовый индекс, что и на сайте, вместо LIKE по
+        # всем публикациям.
+        if not search_term:
+            return queryset, False
+        return search_posts(queryset, search_term), False
+
+    def delete_model(self, request, obj):
+        with deleting_posts([obj.pk]):
+            super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        with deleting_posts(queryset.values_list('pk', flat=True)):
+            super().delete_queryset(request, queryset)
 
 
 @admin.register(Location)
@@ -46,6 +91,7 @@ class AdminLocation(BlogAdmin):
         'is_published',
         'name',
     )
+    search_fields = ('name',)
 
 
 @admin.register(Comment)
@@ -58,3 +104,22 @@ class AdminComment(BlogAdmin):
         'author',
     )
     list_editable = ('text',)
+    list_select_related = ('post', 'author')
+    date_hierarchy = 'created_at'
+    raw_id_fields = ('post',)
+    autocomplete_fields = ('author',)
+    actions = ('delete_selected_comments',)
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    @admin.action(
+        description='Удалить выбранные комментарии', permissions=('delete',)
+    )
+    def delete_selected_comments(self, request, queryset):
+        count = delete_comments(queryset)
+        self.message_user(
+            request, f'Удалено комментариев: {count}', messages.SUCCESS
+        )
@@ -0,0 +1,49 @@
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection, connections
+from django.test.utils import override_settings
+
+
+@contextmanager
+def temporary_database():
+    '''Отдельная временная база SQLite на время бенчмарка.
+
+    Синтетические данные не попадают в рабочую базу, а её запись не
+    блокируется на время наполнения.
+    '''
+    directory = tempfile.mkdtemp()
+    connection.settings_dict['TEST']['NAME'] = str(
+        Path(directory) / 'benchmark.sqlite3'
+    )
+    old_name = connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, serialize=False
+    )
+    try:
+        yield
+    finally:
+        connections.close_all()
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+@contextmanager
+def temporary_cache():
+    '''Отдельный файловый кэш на время бенчмарка.
+
+    Страницы и счётчики лент из временной базы не попадают в общий кэш
+    сайта, а cache.clear() между замерами его не стирает.
+    '''
+    directory = tempfile.mkdtemp()
+    try:
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': directory,
+            'OPTIONS': settings.CACHES['default'].get('OPTIONS', {}),
+        }}):
+            yield
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,108 @@
+from collections import Counter
+from hashlib import md5
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.urls import reverse
+
+from .models import Category
+
+FEED_COUNT_KEY = 'blog:feed-count:{}'
+FEED_VALID_UNTIL_KEY = 'blog:feed-valid-until:{}'
+POST_CARD_KEY = 'blog:post-card:{}:{}'
+PAGE_VERSION_KEY = 'blog:page-version:{}'
+PAGE_KEY = 'blog:page:{}:{}'
+SYNDICATION_KEY = 'blog:syndication:{}'
+SYNDICATION_XML_KEY = 'blog:syndication-xml:{}:{}'
+SYNDICATION_MODIFIED_KEY = 'blog:syndication-modified:{}'
+
+post_card_stats = Counter(hits=0, misses=0)
+
+
+def feed_count_key(*feed):
+    return FEED_COUNT_KEY.format(':'.join(str(part) for part in feed))
+
+
+def feed_valid_until_key(*feed):
+    return FEED_VALID_UNTIL_KEY.format(':'.join(str(part) for part in feed))
+
+
+def syndication_key(*feed):
+    return SYNDICATION_KEY.format(':'.join(str(part) for part in feed))
+
+
+def syndication_modified_key(*feed):
+    return SYNDICATION_MODIFIED_KEY.format(
+        ':'.join(str(part) for part in feed)
+    )
+
+
+def syndication_xml_key(version, feed_type):
+    return SYNDICATION_XML_KEY.format(version, feed_type)
+
+
+def invalidate_feeds(category_ids=(), author_ids=()):
+    '''Сбрасывает число записей, срок актуальности и RSS затронутых лент.'''
+    feeds = [('index',)]
+    feeds += [
+        ('category', category_id)
+        for category_id in category_ids if category_id
+    ]
+    for author_id in author_ids:
+        feeds += [
+            ('profile', author_id, 'all'),
+            ('profile', author_id, 'published'),
+        ]
+    cache.delete_many(
+        [feed_count_key(*feed) for feed in feeds]
+        + [feed_valid_until_key(*feed) for feed in feeds]
+        + [syndication_key(*feed) for feed in feeds]
+    )
+
+
+def post_card_version(post):
+    '''Метка версии карточки из всех полей, которые в ней выводятся.'''
+    category = post.category
+    location = post.location
+    fields = (
+        post.title, post.text, post.pub_date.isoformat(), str(post.image),
+        post.image_variants, post.is_published, post.comment_count,
+        post.author.username,
+        category and (category.title, category.slug, category.is_published),
+        location and (location.name, location.is_published),
+    )
+    return md5(repr(fields).encode()).hexdigest()
+
+
+def post_card_key(post):
+    return POST_CARD_KEY.format(post.pk, post_card_version(post))
+
+
+def page_version_key(path):
+    return PAGE_VERSION_KEY.format(md5(path.encode()).hexdigest())
+
+
+def page_cache_key(path, params):
+    '''Ключ страницы для анонимов; версия пути меняется при очистке.'''
+    version = cache.get_or_set(
+        page_version_key(path), lambda: uuid4().hex, None
+    )
+    digest = md5(repr((path, params)).encode()).hexdigest()
+    return PAGE_KEY.format(version, digest)
+
+
+def purge_pages(paths):
+    '''Сбрасывает все закэшированные страницы (любой page) по путям.'''
+    cache.delete_many([page_version_key(path) for path in set(paths)])
+
+
+def purge_post_pages(post_ids=(), category_ids=(), category_slugs=()):
+    '''Сбрасывает кэш ленты, страниц категорий и страниц публикаций.'''
+    slugs = set(category_slugs)
+    slugs.update(Category.objects.filter(
+        pk__in=[pk for pk in category_ids if pk]
+    ).values_list('slug', flat=True))
+    paths = [reverse('blog:index')]
+    paths += [reverse('blog:category_posts', args=[slug]) for slug in slugs]
+    paths += [reverse('blog:post_detail', args=[pk]) for pk in post_ids]
+    purge_pages(paths)
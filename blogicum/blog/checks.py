@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+)
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    '''Кэш страниц и лент должен быть общим для всех процессов.
+
+    Сигналы и management-команды сбрасывают записи только в том кэше,
+    который видят сами. С кэшем в памяти процесса остальные воркеры
+    отдают устаревшие страницы до истечения срока жизни.
+    '''
+    backend = settings.CACHES['default']['BACKEND']
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    level = Warning if settings.DEBUG else Error
+    return [level(
+        'Кэш по умолчанию хранится в памяти процесса, и сброс страниц '
+        'и лент не доходит до других воркеров.',
+        hint='Укажите в CACHES общий бэкенд: FileBasedCache, '
+             'Memcached или Redis.',
+        id='blog.W001' if settings.DEBUG else 'blog.E001',
+    )]
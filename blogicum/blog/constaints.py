@@ -1,2 +1,19 @@
 NUMBER_OF_POSTS = 10
+NUMBER_OF_COMMENTS = 20
 NUMBER_OF_CHARACTERS = 30
+IMAGE_VARIANT_WIDTHS = {
+    'card': 600,
+    'detail': 900,
+    'card_2x': 1200,
+    'detail_2x': 1800,
+}
+IMAGE_VARIANT_QUALITY = 82
+IMAGE_SIZES = '(max-width: 40rem) 100vw, 40rem'
+IMAGE_GC_GRACE_MINUTES = 60
+METRICS_FLUSH_SECONDS = 5
+SEARCH_TITLE_WEIGHT = 10.0
+SEARCH_TEXT_WEIGHT = 1.0
+BULK_CHUNK_SIZE = 500
+EXPORT_CHUNK_SIZE = 2000
+NUMBER_OF_FEED_ITEMS = 20
+FEED_DESCRIPTION_WORDS = 60
@@ -0,0 +1,199 @@
+import time
+from hashlib import md5
+from uuid import uuid4
+
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404, reverse
+from django.utils import timezone
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, quote_etag
+)
+from django.utils.feedgenerator import Rss201rev2Feed
+from django.utils.http import http_date
+from django.utils.text import Truncator
+
+from .cache import (
+    syndication_key, syndication_modified_key, syndication_xml_key
+)
+from .constaints import FEED_DESCRIPTION_WORDS, NUMBER_OF_FEED_ITEMS
+from .models import Category, Post, User
+from .scheduling import cache_timeout, feed_valid_until
+
+
+def feed_state(feed, scheduled):
+    '''Версия ленты и время её последнего изменения в секундах.
+
+    Хранится в кэше, пока лента не изменится: её сбрасывает
+    invalidate_feeds, а срок жизни не выходит за pub_date ближайшей
+    отложенной публикации из scheduled. Новая версия всегда получает
+    время хотя бы на секунду позже прежней, иначе клиент с одним
+    If-Modified-Since мог бы получить 304 на правку в ту же секунду.
+    '''
+    key = syndication_key(*feed)
+    state = cache.get(key)
+    if state is None:
+        previous = cache.get(syndication_modified_key(*feed))
+        modified = int(time.time())
+        if previous is not None:
+            modified = max(modified, previous + 1)
+        cache.set(syndication_modified_key(*feed), modified, None)
+        state = uuid4().hex, modified
+        cache.set(key, state, feed_timeout(feed, scheduled))
+    return state
+
+
+def feed_timeout(feed, scheduled):
+    return cache_timeout(
+        feed_valid_until(feed, scheduled),
+        settings.BLOG_SYNDICATION_TIMEOUT,
+    )
+
+
+class PostFeed(Feed):
+    '''Лента публикаций в RSS или Atom с ответом 304 без отрисовки.
+
+    Подкласс задаёт:
+    - get_posts(obj) — публикации, видимые в ленте;
+    - get_feed_key(obj) — ключ ленты из blog.cache, по которому
+      invalidate_feeds сбрасывает её версию;
+    - get_scheduled_posts(obj) — отложенные публикации, если они есть.
+
+    ETag и Last-Modified берутся из feed_state, а готовый XML хранится
+    в кэше под версией ленты. Ответ требует перепроверки при каждом
+    запросе: иначе клиенты держали бы ленту по эвристике свежести.
+    '''
+
+    def __init__(self, feed_type=Rss201rev2Feed):
+        self.feed_type = feed_type
+
+    def __call__(self, request, *args, **kwargs):
+        obj = self.get_object(request, *args, **kwargs)
+        feed = self.get_feed_key(obj)
+        scheduled = self.get_scheduled_posts(obj)
+        version, last_modified = feed_state(feed, scheduled)
+        etag = quote_etag(md5(
+            f'{version}:{self.feed_type.__name__}'.encode()
+        ).hexdigest())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            key = syndication_xml_key(version, self.feed_type.__name__)
+            cached = cache.get(key)
+            if cached is None:
+                generator = self.get_feed(obj, request)
+                cached = (
+                    generator.writeString('utf-8'), generator.content_type
+                )
+                cache.set(key, cached, feed_timeout(feed, scheduled))
+            content, content_type = cached
+            response = HttpResponse(content, content_type=content_type)
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(response, no_cache=True)
+        return response
+
+    def get_scheduled_posts(self, obj):
+        return Post.objects.none()
+
+    def items(self, obj):
+        return self.get_posts(obj).select_related(
+            'author', 'category'
+        ).order_by('-pub_date')[:NUMBER_OF_FEED_ITEMS]
+
+    def item_title(self, post):
+        return post.title
+
+    def item_description(self, post):
+        return Truncator(post.text).words(FEED_DESCRIPTION_WORDS)
+
+    def item_link(self, post):
+        return reverse('blog:post_detail', args=[post.pk])
+
+    def item_pubdate(self, post):
+        return post.pub_date
+
+    def item_author_name(self, post):
+        return post.author.get_full_name() or post.author.username
+
+    def item_categories(self, post):
+        return (post.category.title,) if post.category else ()
+
+
+class IndexFeed(PostFeed):
+    title = 'Блогикум'
+    description = 'Новые публикации.'
+
+    def link(self):
+        return reverse('blog:index')
+
+    def get_posts(self, obj):
+        return Post.objects.filter(
+            pub_date__lte=timezone.now(),
+            is_published=True,
+            category__is_published=True,
+        )
+
+    def get_feed_key(self, obj):
+        return ('index',)
+
+    def get_scheduled_posts(self, obj):
+        return Post.objects.filter(
+            is_published=True, category__is_published=True
+        )
+
+
+class CategoryFeed(PostFeed):
+
+    def get_object(self, request, category_slug):
+        return get_object_or_404(
+            Category, slug=category_slug, is_published=True
+        )
+
+    def title(self, category):
+        return f'Блогикум: {category.title}'
+
+    def description(self, category):
+        return category.description
+
+    def link(self, category):
+        return reverse('blog:category_posts', args=[category.slug])
+
+    def get_posts(self, category):
+        return category.posts.filter(
+            is_published=True, pub_date__lte=timezone.now()
+        )
+
+    def get_feed_key(self, category):
+        return ('category', category.pk)
+
+    def get_scheduled_posts(self, category):
+        return category.posts.filter(is_published=True)
+
+
+class ProfileFeed(PostFeed):
+
+    def get_object(self, request, slug):
+        return get_object_or_404(User, username=slug)
+
+    def title(self, user):
+        return f'Блогикум: {user.get_full_name() or user.username}'
+
+    def description(self, user):
+        return f'Публикации пользователя {user.username}.'
+
+    def link(self, user):
+        return reverse('blog:profile', args=[user.username])
+
+    def get_posts(self, user):
+        # Как на странице профиля для других посетителей.
+        return user.posts.filter(pub_date__lte=timezone.now())
+
+    def get_feed_key(self, user):
+        return ('profile', user.pk, 'published')
+
+    def get_scheduled_posts(self, user):
+        return user.posts.all()
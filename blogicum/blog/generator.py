@@ -0,0 +1,202 @@
+import random
+from collections import Counter
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import accumulate, islice
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Category, Comment, Location, Post, User
+from .search import rebuild_index
+
+SYLLABLES = (
+    'ба', 'ве', 'го', 'да', 'ле', 'ми', 'но', 'па', 'ро', 'са', 'ти', 'ку',
+    'зо', 'жа', 'ны', 'ри', 'ст', 'ка', 'ло', 'ре', 'во', 'ча', 'ше', 'юр',
+)
+VOCABULARY_SIZE = 5000
+# Тексты берутся из заранее собранных наборов: склеивать слова для
+# каждой из миллионов записей дольше, чем сами вставки.
+TEXT_POOL_SIZE = 20000
+SCHEDULED_DAYS = 30
+COMMENT_DELAY = 3 * 24 * 3600
+
+
+def zipf(count, exponent=1.0):
+    '''Накопленные веса распределения Ципфа для random.choices.'''
+    return list(accumulate(
+        1 / rank ** exponent for rank in range(1, count + 1)
+    ))
+
+
+@contextmanager
+def explicit_created_at(*models):
+    '''Даёт bulk_create сохранить заданный created_at вместо текущего.'''
+    fields = [model._meta.get_field('created_at') for model in models]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Generator:
+    '''Наполняет базу синтетическими данными через bulk_create.
+
+    Одно и то же зерно и момент anchor дают одинаковые данные.
+    Публикации и комментарии распределены неравномерно: немногие
+    авторы пишут большую часть постов, а немногие посты собирают
+    большую часть комментариев. Сигналы моделей не срабатывают,
+    поэтому счётчики комментариев и поисковый индекс заполняются
+    здесь же.
+    '''
+
+    def __init__(self, seed=0, anchor=None, batch_size=10000,
+                 unpublished=0.05, scheduled=0.02, days=3 * 365, log=None):
+        self.rng = random.Random(seed)
+        self.anchor = anchor or timezone.now()
+        self.batch_size = batch_size
+        self.unpublished = unpublished
+        self.scheduled = scheduled
+        self.days = days
+        self.log = log or (lambda message: None)
+        self.words = sorted({
+            ''.join(self.rng.choices(SYLLABLES, k=self.rng.randint(1, 4)))
+            for _ in range(VOCABULARY_SIZE)
+        })
+        self.rng.shuffle(self.words)
+        self.word_weights = zipf(len(self.words))
+        self.post_texts = [
+            self.phrase(40, 200) for _ in range(TEXT_POOL_SIZE)
+        ]
+        self.comment_texts = [
+            self.phrase(3, 30) for _ in range(TEXT_POOL_SIZE)
+        ]
+
+    def phrase(self, low, high):
+        return ' '.join(self.rng.choices(
+            self.words, cum_weights=self.word_weights,
+            k=self.rng.randint(low, high),
+        ))
+
+    def published(self):
+        return self.rng.random() >= self.unpublished
+
+    def create(self, model, objects, return_pks=True):
+        '''Сохраняет объекты порциями; возвращает их pk по порядку.'''
+        last_pk = model.objects.order_by('-pk').values_list(
+            'pk', flat=True
+        ).first() or 0
+        objects = iter(objects)
+        total = 0
+        while True:
+            batch = list(islice(objects, self.batch_size))
+            if not batch:
+                break
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+            total += len(batch)
+        self.log(f'{model._meta.verbose_name_plural}: {total}')
+        if not return_pks:
+            return None
+        return list(model.objects.filter(pk__gt=last_pk).order_by(
+            'pk'
+        ).values_list('pk', flat=True))
+
+    def generate(self, users, categories, locations, posts, comments):
+        '''Создаёт записи и возвращает, сколько каких получилось.'''
+        with explicit_created_at(Category, Location, Post, Comment):
+            summary = self.create_all(
+                users, categories, locations, posts, comments
+            )
+        with transaction.atomic():
+            self.log(f'Поисковый индекс: {rebuild_index()}')
+        # Ленты и страницы в кэше собраны по старым данным.
+        cache.clear()
+        return summary
+
+    def create_all(self, users, categories, locations, posts, comments):
+        prefix = self.rng.getrandbits(32)
+        user_ids = self.create(User, (
+            User(
+                username=f'user{prefix:x}-{number}', password='!',
+                first_name=self.phrase(1, 1).title(),
+                last_name=self.phrase(1, 1).title(),
+            ) for number in range(users)
+        ))
+        category_ids = self.create(Category, (
+            Category(
+                title=self.phrase(1, 3).capitalize(),
+                description=self.phrase(5, 20),
+                slug=f'category-{prefix:x}-{number}',
+                is_published=self.published(),
+                created_at=self.anchor - timedelta(days=self.days),
+            ) for number in range(categories)
+        ))
+        location_ids = self.create(Location, (
+            Location(
+                name=self.phrase(1, 2).title(),
+                is_published=self.published(),
+                created_at=self.anchor - timedelta(days=self.days),
+            ) for _ in range(locations)
+        ))
+
+        # Даты: большинство в прошлом за days дней, часть — отложенные.
+        span = self.days * 24 * 3600
+        pub_dates = [
+            self.anchor + timedelta(
+                seconds=self.rng.uniform(0, SCHEDULED_DAYS * 24 * 3600)
+            ) if self.rng.random() < self.scheduled
+            else self.anchor - timedelta(seconds=self.rng.uniform(0, span))
+            for _ in range(posts)
+        ]
+        visible = [
+            number for number, moment in enumerate(pub_dates)
+            if moment <= self.anchor
+        ]
+        comment_counts = Counter(self.rng.choices(
+            visible, cum_weights=zipf(len(visible), 1.1), k=comments,
+        )) if visible and comments else Counter()
+        author_weights = zipf(len(user_ids))
+        category_weights = zipf(len(category_ids), 0.8)
+        post_ids = self.create(Post, (
+            Post(
+                title=self.phrase(2, 8).capitalize(),
+                text=self.rng.choice(self.post_texts),
+                pub_date=pub_dates[number],
+                created_at=min(pub_dates[number], self.anchor),
+                author_id=self.rng.choices(
+                    user_ids, cum_weights=author_weights
+                )[0],
+                category_id=self.rng.choices(
+                    category_ids, cum_weights=category_weights
+                )[0] if category_ids else None,
+                location_id=self.rng.choice(location_ids) if (
+                    location_ids and self.rng.random() < 0.7
+                ) else None,
+                is_published=self.published(),
+                comment_count=comment_counts[number],
+            ) for number in range(posts)
+        ))
+        self.create(Comment, (
+            Comment(
+                post_id=post_ids[number],
+                author_id=self.rng.choice(user_ids),
+                text=self.rng.choice(self.comment_texts),
+                created_at=min(self.anchor, pub_dates[number] + timedelta(
+                    seconds=self.rng.expovariate(1 / COMMENT_DELAY)
+                )),
+            )
+            for number in sorted(comment_counts)
+            for _ in range(comment_counts[number])
+        ), return_pks=False)
+        return {
+            'users': len(user_ids),
+            'categories': len(category_ids),
+            'locations': len(location_ids),
+            'posts': len(post_ids),
+            'comments': sum(comment_counts.values()),
+        }
@@ -0,0 +1,69 @@
+import logging
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from .constaints import IMAGE_VARIANT_QUALITY, IMAGE_VARIANT_WIDTHS
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {'JPEG': '.jpg', 'PNG': '.png', 'GIF': '.gif'}
+EXIF_ORIENTATION = 0x0112
+ROTATED = (5, 6, 7, 8)
+
+
+def variant_name(name, suffix, extension):
+    '''Имя копии зависит от ширины, чтобы URL не менял содержимое.'''
+    path = PurePosixPath(name)
+    return str(path.parent / 'variants' / f'{path.stem}_{suffix}{extension}')
+
+
+def build_variants(name, storage):
+    '''Уменьшенные копии изображения name из storage для srcset.
+
+    Возвращает словарь {вариант: {'name', 'width', 'height'}}; ключ
+    'original' описывает размеры исходного файла. Больше исходника
+    картинки не растягиваются.
+    '''
+    with storage.open(name) as source, Image.open(source) as image:
+        image_format = image.format if image.format in FORMATS else 'JPEG'
+        width, height = image.size
+        if image.getexif().get(EXIF_ORIENTATION, 1) in ROTATED:
+            width, height = height, width
+        variants = {'original': {
+            'name': name, 'width': width, 'height': height,
+        }}
+        largest = max(IMAGE_VARIANT_WIDTHS.values())
+        image.draft('RGB', (largest, largest))
+        image = ImageOps.exif_transpose(image)
+        if image_format == 'JPEG' and image.mode != 'RGB':
+            image = image.convert('RGB')
+        for variant, width in IMAGE_VARIANT_WIDTHS.items():
+            if width >= variants['original']['width']:
+                continue
+            resized = image.copy()
+            resized.thumbnail((width, image.height), Image.Resampling.LANCZOS)
+            buffer = BytesIO()
+            resized.save(
+                buffer, image_format,
+                quality=IMAGE_VARIANT_QUALITY, optimize=True,
+            )
+            target = variant_name(name, f'{width}w', FORMATS[image_format])
+            if storage.exists(target):
+                storage.delete(target)
+            variants[variant] = {
+                'name': storage.save(target, ContentFile(buffer.getvalue())),
+                'width': resized.width,
+                'height': resized.height,
+            }
+    return variants
+
+
+def safe_build_variants(name, storage):
+    try:
+        return build_variants(name, storage)
+    except (OSError, ValueError) as error:
+        logger.warning('Не удалось обработать изображение %s: %s', name, error)
+        return {'original': {'name': name}}
@@ -0,0 +1,393 @@
+import codecs
+import json
+import os
+import re
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .generator import explicit_created_at
+from .models import Category, Comment, Location, Post, User
+from .moderation import chunks, recount_comments
+from .search import index_posts
+
+READ_SIZE = 1 << 20
+# Предел длины одной записи в символах: дальше буфер не растёт.
+MAX_RECORD_SIZE = 16 << 20
+# Обрыв буфера посреди литерала, числа или \u-последовательности
+# даёт ошибку не дальше стольких символов от конца.
+TRUNCATED_TAIL = 16
+REPORT_INTERVAL = 5
+# Порядок сохранения внутри порции: сначала те, на кого ссылаются.
+MODELS = {
+    'blog.category': Category,
+    'blog.location': Location,
+    'blog.post': Post,
+    'blog.comment': Comment,
+}
+# Поля, которые считаются по другим данным, а не переносятся.
+DERIVED_FIELDS = {'comment_count', 'image_variants'}
+SEPARATORS = re.compile(r'[\s,\[\]]*')
+
+
+class DumpError(ValueError):
+    pass
+
+
+class RecordReader:
+    '''Читает объекты из JSON-массива или NDJSON по одному.
+
+    Файл не загружается целиком: в памяти только недочитанный хвост.
+    Буфер дочитывается, только если ошибка разбора вызвана его концом;
+    прочие ошибки и записи длиннее MAX_RECORD_SIZE дают DumpError.
+    tell() возвращает смещение в байтах после последнего объекта,
+    с него чтение можно продолжить в другой раз.
+    '''
+
+    def __init__(self, stream, offset=0):
+        stream.seek(offset)
+        self.stream = stream
+        self.offset = offset
+        self.decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        self.decode = json.JSONDecoder().raw_decode
+        self.buffer = ''
+        self.position = 0
+
+    def tell(self):
+        return self.offset + len(
+            self.buffer[:self.position].encode('utf-8')
+        )
+
+    def fill(self):
+        consumed = self.buffer[:self.position]
+        self.offset += len(consumed.encode('utf-8'))
+        chunk = self.stream.read(READ_SIZE)
+        self.buffer = self.buffer[self.position:] + self.decoder.decode(
+            chunk, final=not chunk
+        )
+        self.position = 0
+        return bool(chunk)
+
+    def truncated(self, error):
+        '''Ошибка разбора вызвана концом буфера, а не самим JSON.'''
+        return (
+            error.msg.startswith('Unterminated string')
+            or len(self.buffer) - error.pos <= TRUNCATED_TAIL
+        )
+
+    def __iter__(self):
+        while True:
+            self.position = SEPARATORS.match(
+                self.buffer, self.position
+            ).end()
+            if self.position == len(self.buffer):
+                if not self.fill():
+                    return
+                continue
+            try:
+                record, end = self.decode(self.buffer, self.position)
+            except json.JSONDecodeError as error:
+                if not self.truncated(error):
+                    raise DumpError(
+                        f'Некорректный JSON около байта {self.tell()}: {error}'
+                    )
+                if len(self.buffer) - self.position > MAX_RECORD_SIZE:
+                    raise DumpError(
+                        f'Запись около байта {self.tell()} длиннее '
+                        f'{MAX_RECORD_SIZE} символов.'
+                    )
+                if self.fill():
+                    continue
+                raise DumpError(
+                    f'Некорректный JSON около байта {self.tell()}: {error}'
+                )
+            self.position = end
+            yield record
+
+
+class Journal:
+    '''Журнал импорта: по строке JSON на сохранённую порцию.
+
+    Строка пишется внутри транзакции порции, перед её фиксацией.
+    Если процесс оборвался между записью и фиксацией, последняя
+    строка указывает на несохранённые записи — при загрузке она
+    сверяется с базой и отбрасывается.
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+        self.ids = defaultdict(dict)
+        self.totals = Counter()
+        entries = []
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as journal:
+                entries = [json.loads(line) for line in journal if line]
+        if entries and not self.committed(entries[-1]):
+            entries.pop()
+            self.rewrite(entries)
+        for entry in entries:
+            self.apply(entry)
+
+    @staticmethod
+    def committed(entry):
+        if not entry.get('check'):
+            return True
+        label, pk = entry['check']
+        return MODELS[label].objects.filter(pk=pk).exists()
+
+    def rewrite(self, entries):
+        with open(self.path, 'w', encoding='utf-8') as journal:
+            for entry in entries:
+                journal.write(json.dumps(entry) + '\n')
+
+    def apply(self, entry):
+        self.offset = entry['offset']
+        self.totals.update(entry['totals'])
+        for label, pairs in entry['ids'].items():
+            self.ids[label].update(pairs)
+
+    def write(self, entry):
+        with open(self.path, 'a', encoding='utf-8') as journal:
+            journal.write(json.dumps(entry) + '\n')
+            journal.flush()
+            os.fsync(journal.fileno())
+        self.apply(entry)
+
+
+class Importer:
+    '''Переносит категории, места, публикации и комментарии из дампа.
+
+    Понимает формат dumpdata (JSON-массив) и NDJSON с теми же
+    объектами. Записи сохраняются через bulk_create порциями, каждая
+    в своей транзакции; внешние ключи переводятся из первичных ключей
+    дампа в новые через словарь в памяти. Авторы ищутся среди
+    существующих пользователей по pk или по username, если дамп сделан
+    с --natural-foreign, а категории с уже занятым slug связываются с
+    существующими вместо создания дублей. Прогресс пишется в журнал,
+    и прерванный импорт продолжается с последней сохранённой порции.
+    '''
+
+    def __init__(self, path, journal_path=None, batch_size=5000,
+                 log=None):
+        self.path = path
+        self.journal = Journal(journal_path or f'{path}.import')
+        self.batch_size = batch_size
+        self.log = log or (lambda message: None)
+        self.users = {}
+
+    def run(self):
+        '''Импортирует файл и возвращает счётчики по моделям.'''
+        size = os.path.getsize(self.path)
+        started = reported = time.perf_counter()
+        start = self.journal.offset, self.imported()
+        with open(self.path, 'rb') as stream, explicit_created_at(
+            Category, Location, Post, Comment
+        ):
+            reader = RecordReader(stream, self.journal.offset)
+            batch = []
+            for record in reader:
+                batch.append(record)
+                if len(batch) < self.batch_size:
+                    continue
+                self.save(batch, reader.tell())
+                batch = []
+                if time.perf_counter() - reported >= REPORT_INTERVAL:
+                    reported = time.perf_counter()
+                    self.report(start, size, started)
+            if batch or reader.tell() != self.journal.offset:
+                self.save(batch, reader.tell())
+        self.report(start, size, started)
+        # Ленты и страницы в кэше собраны без новых записей.
+        cache.clear()
+        return dict(self.journal.totals)
+
+    def imported(self):
+        return sum(
+            count for key, count in self.journal.totals.items()
+            if key in MODELS
+        )
+
+    def report(self, start, size, started):
+        elapsed = time.perf_counter() - started or 1e-9
+        offset, records = start
+        self.log(
+            f'{self.journal.offset / size if size else 1:6.1%}  '
+            f'записей {self.imported()}, '
+            f'{(self.imported() - records) / elapsed:.0f} в секунду, '
+            f'{(self.journal.offset - offset) / elapsed / 2 ** 20:.1f} МБ/с'
+        )
+
+    def save(self, batch, offset):
+        grouped = defaultdict(list)
+        totals = Counter()
+        for record in batch:
+            label = isinstance(record, dict) and str(
+                record.get('model', '')
+            ).lower()
+            if label in MODELS:
+                grouped[label].append(record)
+            else:
+                totals['пропущено других моделей'] += 1
+        try:
+            with transaction.atomic():
+                self.save_grouped(grouped, totals, offset)
+        except IntegrityError as error:
+            raise DumpError(
+                f'Записи до байта {offset} нарушают ограничения базы: {error}'
+            )
+
+    def save_grouped(self, grouped, totals, offset):
+        ids = {}
+        check = None
+        self.resolve_users(
+            record['fields'].get('author')
+            for label in ('blog.post', 'blog.comment')
+            for record in grouped[label]
+        )
+        for label, model in MODELS.items():
+            records, matched, slugs = grouped[label], [], {}
+            if label == 'blog.category':
+                records, matched, slugs = self.match_categories(records)
+            if not records and not matched:
+                continue
+            objects, sources = self.build(model, records, totals)
+            pks = self.create(model, objects)
+            if pks:
+                check = (label, pks[-1])
+            totals[label] += len(pks)
+            if label == 'blog.post':
+                index_posts(pks)
+            elif label == 'blog.comment':
+                recount_comments({obj.post_id for obj in objects})
+            pairs = [
+                (source, pk) for source, pk in zip(sources, pks)
+                if source is not None
+            ]
+            if matched:
+                slugs.update((obj.slug, pk) for obj, pk in zip(objects, pks))
+                pairs += [
+                    (source, slugs[slug]) for source, slug in matched
+                    if source is not None
+                ]
+                totals[f'{label}: найдено по slug'] += len(matched)
+            if pairs and label != 'blog.comment':
+                ids[label] = pairs
+                self.journal.ids[label].update(pairs)
+        self.journal.write({
+            'offset': offset, 'totals': totals, 'ids': ids,
+            'check': check,
+        })
+
+    @staticmethod
+    def match_categories(records):
+        '''Делит категории дампа на новые и те, чей slug уже занят.
+
+        Возвращает записи для создания, пары (pk в дампе, slug) для
+        остальных и словарь slug -> pk уже существующих категорий.
+        '''
+        wanted = list({record['fields'].get('slug') for record in records})
+        slugs = {}
+        for chunk in chunks(wanted):
+            slugs.update(Category.objects.filter(
+                slug__in=chunk
+            ).values_list('slug', 'pk'))
+        new, matched, seen = [], [], set()
+        for record in records:
+            slug = record['fields'].get('slug')
+            if slug in slugs or slug in seen:
+                matched.append((record.get('pk'), slug))
+            else:
+                seen.add(slug)
+                new.append(record)
+        return new, matched, slugs
+
+    @staticmethod
+    def create(model, objects):
+        '''Сохраняет объекты и возвращает их новые pk по порядку.'''
+        if not objects:
+            return []
+        last_pk = model.objects.order_by('-pk').values_list(
+            'pk', flat=True
+        ).first() or 0
+        model.objects.bulk_create(objects)
+        if objects[0].pk is not None:
+            return [obj.pk for obj in objects]
+        # SQLite не возвращает pk из bulk_create; в транзакции порции
+        # новые строки идут подряд после прежнего максимума.
+        return list(model.objects.filter(pk__gt=last_pk).order_by(
+            'pk'
+        ).values_list('pk', flat=True))
+
+    def resolve_users(self, keys):
+        pending = {
+            key if isinstance(key, int) else tuple(key)
+            for key in keys if key is not None
+        } - self.users.keys()
+        pks = [key for key in pending if isinstance(key, int)]
+        names = [key[0] for key in pending if isinstance(key, tuple)]
+        for chunk in chunks(pks):
+            for pk in User.objects.filter(pk__in=chunk).values_list(
+                'pk', flat=True
+            ):
+                self.users[pk] = pk
+        for chunk in chunks(names):
+            for pk, username in User.objects.filter(
+                username__in=chunk
+            ).values_list('pk', 'username'):
+                self.users[(username,)] = pk
+
+    def user(self, key):
+        if key is None:
+            return None
+        return self.users.get(key if isinstance(key, int) else tuple(key))
+
+    def build(self, model, records, totals):
+        '''Объекты модели из записей дампа; связи переводятся в новые pk.'''
+        objects, sources = [], []
+        for record in records:
+            values = {}
+            skip = False
+            for field in model._meta.concrete_fields:
+                if field.primary_key or field.name in DERIVED_FIELDS:
+                    continue
+                if field.name not in record['fields']:
+                    continue
+                value = record['fields'][field.name]
+                if field.is_relation:
+                    value = self.relation(field, value)
+                    if value is None and not field.null:
+                        skip = True
+                        break
+                    if value is None and record['fields'][field.name]:
+                        totals[f'{field.name}: связь не найдена'] += 1
+                    values[field.attname] = value
+                else:
+                    values[field.name] = self.convert(field, value)
+            if skip:
+                totals[f'{model._meta.label_lower}: связь не найдена'] += 1
+                continue
+            values.setdefault('created_at', timezone.now())
+            objects.append(model(**values))
+            sources.append(record.get('pk'))
+        return objects, sources
+
+    def relation(self, field, value):
+        if field.related_model is User:
+            return self.user(value)
+        label = field.related_model._meta.label_lower
+        return self.journal.ids[label].get(value)
+
+    @staticmethod
+    def convert(field, value):
+        value = field.to_python(value)
+        if (
+            settings.USE_TZ and field.get_internal_type() == 'DateTimeField'
+            and value is not None and timezone.is_naive(value)
+        ):
+            value = timezone.make_aware(value)
+        return value
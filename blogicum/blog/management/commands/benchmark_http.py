@@ -0,0 +1,446 @@
+import io
+import json
+import random
+import statistics
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from http.cookies import SimpleCookie
+from pathlib import Path
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth import (
+    BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+)
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.db import connection, connections
+from django.test.client import FakePayload
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.benchmarking import temporary_cache, temporary_database
+from blog.models import Category, Comment, Location, Post, User
+from blog.search import rebuild_index
+
+SCALES = {
+    'small': 1000,
+    'medium': 10000,
+    'large': 100000,
+}
+POSTS_PER_USER = 20
+COMMENTS_PER_POST = 3
+BATCH_SIZE = 5000
+HOST = 'localhost'
+# Среднее число запросов плавает из-за кэша страниц; рост меньше
+# половины запроса на запрос регрессией не считается.
+QUERY_SLACK = 0.5
+
+
+def percentile(values, share):
+    '''Значение по методу ближайшего ранга из отсортированного списка.'''
+    index = max(0, min(len(values) - 1, round(share * len(values)) - 1))
+    return values[index]
+
+
+class Session:
+    '''Клиент бенчмарка: куки сессии и CSRF одного пользователя.'''
+
+    def __init__(self, user=None):
+        self.user = user
+        self.cookies = SimpleCookie()
+        if user is not None:
+            store = SessionStore()
+            store[SESSION_KEY] = str(user.pk)
+            store[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+            store[HASH_SESSION_KEY] = user.get_session_auth_hash()
+            store.create()
+            self.cookies[settings.SESSION_COOKIE_NAME] = store.session_key
+        self.post_ids = []
+        self.comments = []
+
+    def environ(self, method, url, data=None):
+        path, _, query = url.partition('?')
+        body = urlencode(data or {}).encode()
+        environ = {
+            'REQUEST_METHOD': method,
+            'PATH_INFO': path,
+            'QUERY_STRING': query,
+            'SERVER_NAME': HOST,
+            'SERVER_PORT': '80',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'HTTP_HOST': HOST,
+            'REMOTE_ADDR': '127.0.0.1',
+            'HTTP_COOKIE': self.cookies.output(header='', sep=';').strip(),
+            'wsgi.url_scheme': 'http',
+            'wsgi.input': FakePayload(body),
+            'wsgi.errors': io.StringIO(),
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+            'wsgi.version': (1, 0),
+        }
+        if method == 'POST':
+            csrf = self.cookies.get(settings.CSRF_COOKIE_NAME)
+            environ.update({
+                'CONTENT_TYPE': 'application/x-www-form-urlencoded',
+                'CONTENT_LENGTH': str(len(body)),
+                'HTTP_X_CSRFTOKEN': csrf.value if csrf else '',
+            })
+        return environ
+
+    def request(self, application, method, path, data=None):
+        status = {}
+
+        def start_response(line, headers, exc_info=None):
+            status['code'] = int(line.split()[0])
+            for name, value in headers:
+                if name.lower() == 'set-cookie':
+                    self.cookies.load(value)
+
+        result = application(self.environ(method, path, data), start_response)
+        try:
+            size = sum(len(chunk) for chunk in result)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        return status['code'], size
+
+
+def find_regressions(report, baseline, tolerance):
+    '''Маршруты, где p95 вырос больше допуска или прибавились запросы.'''
+    regressions = []
+    for name, current in report['routes'].items():
+        previous = baseline.get('routes', {}).get(name)
+        if previous is None:
+            continue
+        metrics = []
+        if current['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+            metrics.append('p95_ms')
+        if current['queries_per_request'] > (
+            previous['queries_per_request'] + QUERY_SLACK
+        ):
+            metrics.append('queries_per_request')
+        if current['errors'] > previous['errors']:
+            metrics.append('errors')
+        if metrics:
+            regressions.append({
+                'route': name,
+                'metrics': metrics,
+                'baseline': previous,
+                'current': current,
+            })
+    return regressions
+
+
+def get(name, *args):
+    return lambda rng, session, data: ('GET', reverse(name, args=args), None)
+
+
+def get_any(name, key):
+    '''GET маршрута name со случайным аргументом из data[key].'''
+    return lambda rng, session, data: (
+        'GET', reverse(name, args=[rng.choice(data[key])]), None
+    )
+
+
+def post_form(rng, data):
+    return {
+        'title': 'Бенчмарк',
+        'text': ' '.join(rng.choices(data['words'], k=50)),
+        'pub_date': timezone.localtime().strftime('%Y-%m-%d %H:%M:%S'),
+        'category': rng.choice(data['category_ids']),
+        'is_published': 'on',
+    }
+
+
+def delete_post(rng, session, data):
+    # Публикация для удаления создаётся до замера, иначе свои
+    # публикации у клиента быстро закончатся.
+    post = Post.objects.create(
+        title='На удаление', text='Текст', pub_date=timezone.now(),
+        author=session.user, category_id=rng.choice(data['category_ids']),
+    )
+    return 'POST', reverse('blog:delete_post', args=[post.pk]), {}
+
+
+def delete_comment(rng, session, data):
+    comment = Comment.objects.create(
+        post_id=rng.choice(data['post_ids']), author=session.user,
+        text='На удаление',
+    )
+    return 'POST', reverse(
+        'blog:delete_comment', args=[comment.post_id, comment.pk]
+    ), {}
+
+
+def edit_comment(rng, session, data):
+    post_id, comment_id = rng.choice(session.comments)
+    return 'POST', reverse(
+        'blog:edit_comment', args=[post_id, comment_id]
+    ), {'text': 'Комментарий из бенчмарка, правка'}
+
+
+def edit_profile(rng, session, data):
+    return 'POST', reverse('blog:edit_profile'), {
+        'username': session.user.username,
+        'first_name': 'Имя', 'last_name': rng.choice(data['words']),
+        'email': f'{session.user.username}@example.com',
+    }
+
+
+def routes():
+    '''Именованные маршруты blog и pages: (имя, нужен вход, запрос).
+
+    Нет только blog:export: это выгрузка всей базы для персонала, а не
+    маршрут под нагрузкой.
+    '''
+    return (
+        ('blog:index', False, get('blog:index')),
+        ('blog:category_posts', False, get_any(
+            'blog:category_posts', 'slugs'
+        )),
+        ('blog:profile', False, get_any('blog:profile', 'usernames')),
+        ('blog:post_detail', False, get_any('blog:post_detail', 'post_ids')),
+        ('blog:comments', False, get_any('blog:comments', 'post_ids')),
+        ('blog:search', False, lambda rng, session, data: (
+            'GET', reverse('blog:search') + '?' + urlencode(
+                {'q': rng.choice(data['words'])}
+            ), None,
+        )),
+        ('blog:index_rss', False, get('blog:index_rss')),
+        ('blog:index_atom', False, get('blog:index_atom')),
+        ('blog:category_rss', False, get_any('blog:category_rss', 'slugs')),
+        ('blog:category_atom', False, get_any(
+            'blog:category_atom', 'slugs'
+        )),
+        ('blog:profile_rss', False, get_any('blog:profile_rss', 'usernames')),
+        ('blog:profile_atom', False, get_any(
+            'blog:profile_atom', 'usernames'
+        )),
+        ('blog:metrics', False, get('blog:metrics')),
+        ('blog:create_post', True, lambda rng, session, data: (
+            'POST', reverse('blog:create_post'), post_form(rng, data),
+        )),
+        ('blog:edit_post', True, lambda rng, session, data: (
+            'POST', reverse(
+                'blog:edit_post', args=[rng.choice(session.post_ids)]
+            ), dict(post_form(rng, data), title='Бенчмарк, правка'),
+        )),
+        ('blog:delete_post', True, delete_post),
+        ('blog:add_comment', True, lambda rng, session, data: (
+            'POST', reverse(
+                'blog:add_comment', args=[rng.choice(data['post_ids'])]
+            ), {'text': 'Комментарий из бенчмарка'},
+        )),
+        ('blog:edit_comment', True, edit_comment),
+        ('blog:delete_comment', True, delete_comment),
+        ('blog:edit_profile', True, edit_profile),
+        ('pages:about', False, get('pages:about')),
+        ('pages:rules', False, get('pages:rules')),
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный бенчмарк именованных маршрутов blog и pages, кроме '
+        'выгрузки blog:export, через WSGI-приложение. '
+        'Создаёт отдельные временные базу и кэш, наполняет базу данными '
+        'выбранного масштаба и печатает JSON с задержками p50/p95/p99, '
+        'запросами в секунду и числом SQL-запросов на запрос. '
+        'Запросы идут с DEBUG = False, как в боевом режиме.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale', choices=SCALES, default='small',
+            help='Масштаб данных: число публикаций %s.' % SCALES,
+        )
+        parser.add_argument('--posts', type=int, help='Своё число публикаций.')
+        parser.add_argument(
+            '--requests', type=int, default=200,
+            help='Сколько запросов отправить на каждый маршрут.',
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=8,
+            help='Сколько клиентов работают одновременно.',
+        )
+        parser.add_argument(
+            '--route', action='append', dest='only',
+            help='Замерить только этот маршрут (можно повторять).',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='Куда сохранить JSON.')
+        parser.add_argument(
+            '--baseline',
+            help='JSON прошлого запуска: отметить маршруты, ставшие хуже.',
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.2,
+            help='Допустимый рост p95 относительно базового замера.',
+        )
+
+    def handle(self, *args, **options):
+        settings.DEBUG = False
+        with temporary_cache(), temporary_database():
+            report = self.benchmark(**options)
+        regressions = []
+        if options['baseline']:
+            baseline = json.loads(Path(options['baseline']).read_text())
+            regressions = find_regressions(
+                report, baseline, options['tolerance']
+            )
+            report['regressions'] = regressions
+        output = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            Path(options['output']).write_text(output)
+        self.stdout.write(output)
+        if regressions:
+            raise CommandError(
+                'Маршруты стали медленнее базового замера: '
+                + ', '.join(item['route'] for item in regressions)
+            )
+
+    def seed(self, posts, rng):
+        '''Пользователи, категории, места, публикации и комментарии.'''
+        User.objects.bulk_create(
+            User(username=f'bench{number}')
+            for number in range(max(1, posts // POSTS_PER_USER))
+        )
+        users = list(User.objects.order_by('pk'))
+        Category.objects.bulk_create(
+            Category(
+                title=f'Категория {number}', description='Описание',
+                slug=f'category-{number}',
+            ) for number in range(max(1, posts // 1000))
+        )
+        categories = list(Category.objects.order_by('pk'))
+        Location.objects.bulk_create(
+            Location(name=f'Место {number}') for number in range(10)
+        )
+        locations = list(Location.objects.order_by('pk'))
+        words = [f'слово{number}' for number in range(500)]
+        now = timezone.now()
+        for start in range(0, posts, BATCH_SIZE):
+            Post.objects.bulk_create(
+                Post(
+                    title=' '.join(rng.choices(words, k=4)),
+                    text=' '.join(rng.choices(words, k=60)),
+                    pub_date=now - timedelta(hours=number),
+                    author=users[number % len(users)],
+                    category=rng.choice(categories),
+                    location=rng.choice(locations),
+                    comment_count=COMMENTS_PER_POST,
+                ) for number in range(start, min(start + BATCH_SIZE, posts))
+            )
+        post_ids = list(Post.objects.values_list('pk', flat=True))
+        for start in range(0, len(post_ids), BATCH_SIZE):
+            Comment.objects.bulk_create(
+                Comment(post_id=post_id, author=rng.choice(users), text='Да')
+                for post_id in post_ids[start:start + BATCH_SIZE]
+                for _ in range(COMMENTS_PER_POST)
+            )
+        rebuild_index()
+        return {
+            'users': users,
+            'usernames': [user.username for user in users],
+            'slugs': [category.slug for category in categories],
+            'category_ids': [category.pk for category in categories],
+            'post_ids': post_ids,
+            'words': words,
+        }
+
+    def benchmark(self, *, scale, posts, requests, concurrency, only, seed,
+                  **options):
+        rng = random.Random(seed)
+        posts = posts or SCALES[scale]
+        started = time.perf_counter()
+        data = self.seed(posts, rng)
+        report = {
+            'scale': {'posts': posts, 'users': len(data['users'])},
+            'requests': requests,
+            'concurrency': concurrency,
+            'seed_seconds': round(time.perf_counter() - started, 2),
+            'routes': {},
+        }
+        application = get_wsgi_application()
+        users = data.pop('users')[:concurrency]
+        sessions = {False: [], True: []}
+        for number in range(concurrency):
+            user = users[number % len(users)]
+            authenticated = Session(user)
+            authenticated.post_ids = list(
+                Post.objects.filter(author=user).values_list('pk', flat=True)
+            )
+            authenticated.comments = list(Comment.objects.filter(
+                author=user
+            ).values_list('post_id', 'pk'))
+            authenticated.request(
+                application, 'GET', reverse('blog:create_post')
+            )
+            sessions[True].append(authenticated)
+            sessions[False].append(Session())
+        connections.close_all()
+        for name, needs_login, make_request in routes():
+            if only and name not in only:
+                continue
+            cache.clear()
+            report['routes'][name] = self.run_route(
+                application, sessions[needs_login], make_request, data,
+                requests, rng.random(),
+            )
+        return report
+
+    def run_route(self, application, sessions, make_request, data, total,
+                  seed):
+        def worker(number):
+            session = sessions[number]
+            rng = random.Random(f'{seed}-{number}')
+            results = []
+            queries = [0]
+
+            def count_queries(execute, sql, params, many, context):
+                queries[0] += 1
+                return execute(sql, params, many, context)
+
+            with connection.execute_wrapper(count_queries):
+                for _ in range(number, total, len(sessions)):
+                    method, path, body = make_request(rng, session, data)
+                    before = queries[0]
+                    started = time.perf_counter()
+                    status, size = session.request(
+                        application, method, path, body
+                    )
+                    results.append((
+                        time.perf_counter() - started, status,
+                        queries[0] - before,
+                    ))
+            connection.close()
+            return results
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(sessions)) as pool:
+            results = [
+                item for chunk in pool.map(worker, range(len(sessions)))
+                for item in chunk
+            ]
+        elapsed = time.perf_counter() - started
+        latencies = sorted(duration * 1000 for duration, _, _ in results)
+        return {
+            'requests': len(results),
+            'errors': sum(1 for _, status, _ in results if status >= 400),
+            'statuses': dict(Counter(
+                str(status) for _, status, _ in results
+            ).most_common()),
+            'p50_ms': round(percentile(latencies, 0.50), 2),
+            'p95_ms': round(percentile(latencies, 0.95), 2),
+            'p99_ms': round(percentile(latencies, 0.99), 2),
+            'rps': round(len(results) / elapsed, 1),
+            'queries_per_request': round(statistics.mean(
+                count for _, _, count in results
+            ), 2),
+        }
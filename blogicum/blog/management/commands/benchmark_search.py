@@ -0,0 +1,128 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+from itertools import accumulate
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+
+from blog.benchmarking import temporary_database
+from blog.constaints import NUMBER_OF_POSTS
+from blog.models import Category, Post, User
+from blog.search import fts_available, rebuild_index, search_posts
+
+ALPHABET = 'абвгдеёжзийклмнопрстуфхцчшщыэюя'
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет полнотекстовый поиск на синтетических публикациях и '
+        'сравнивает его с icontains. Данные создаются во временной базе, '
+        'которая удаляется после замера.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--posts', type=int, default=1_000_000,
+            help='Сколько публикаций создать.',
+        )
+        parser.add_argument(
+            '--queries', type=int, default=200,
+            help='Сколько поисковых запросов выполнить через FTS5.',
+        )
+        parser.add_argument(
+            '--like-queries', type=int, default=5,
+            help='Сколько тех же запросов выполнить через icontains.',
+        )
+        parser.add_argument('--batch-size', type=int, default=10000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, posts, queries, like_queries, batch_size, seed,
+               **options):
+        if not fts_available():
+            raise CommandError('Полнотекстовый индекс есть только в SQLite.')
+        rng = random.Random(seed)
+        words = sorted({
+            ''.join(rng.choices(ALPHABET, k=rng.randint(3, 10)))
+            for _ in range(20000)
+        })
+        rng.shuffle(words)
+        weights = list(accumulate(
+            1 / rank for rank in range(1, len(words) + 1)
+        ))
+
+        def phrase(low, high):
+            return ' '.join(rng.choices(
+                words, cum_weights=weights,
+                k=rng.randint(low, high),
+            ))
+
+        with temporary_database():
+            started = time.perf_counter()
+            author = User.objects.create(username='bench')
+            category = Category.objects.create(
+                title='Бенчмарк', description='Бенчмарк',
+                slug='bench',
+            )
+            now = timezone.now()
+            for start in range(0, posts, batch_size):
+                Post.objects.bulk_create(
+                    Post(
+                        title=phrase(3, 8), text=phrase(40, 120),
+                        pub_date=now - timedelta(minutes=number),
+                        author=author, category=category,
+                    ) for number in range(
+                        start, min(start + batch_size, posts)
+                    )
+                )
+            self.stdout.write(
+                f'Создано публикаций: {posts} '
+                f'за {time.perf_counter() - started:.1f} с'
+            )
+            started = time.perf_counter()
+            rebuild_index()
+            self.stdout.write(
+                f'Индекс построен за {time.perf_counter() - started:.1f} с'
+            )
+
+            visible = Post.objects.select_related(
+                'location', 'author', 'category'
+            ).filter(
+                pub_date__lte=timezone.now(),
+                is_published=True,
+                category__is_published=True,
+            )
+            texts = [phrase(1, 2) for _ in range(queries)]
+            self.report('FTS5', [
+                self.measure(search_posts(visible, text))
+                for text in texts
+            ])
+            self.report('icontains', [
+                self.measure(visible.filter(*(
+                    Q(title__icontains=term) | Q(text__icontains=term)
+                    for term in text.split()
+                )).order_by('-pub_date'))
+                for text in texts[:like_queries]
+            ])
+
+    def measure(self, queryset):
+        '''Время первой страницы выдачи и подсчёта страниц, как во view.'''
+        queryset = queryset[:settings.BLOG_SEARCH_RESULT_LIMIT]
+        started = time.perf_counter()
+        list(queryset[:NUMBER_OF_POSTS])
+        queryset.count()
+        return (time.perf_counter() - started) * 1000
+
+    def report(self, name, timings):
+        if not timings:
+            return
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(
+            f'{name}: запросов {len(timings)}, '
+            f'медиана {statistics.median(timings):.1f} мс, '
+            f'p95 {p95:.1f} мс, максимум {timings[-1]:.1f} мс'
+        )
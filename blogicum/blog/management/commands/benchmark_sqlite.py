@@ -0,0 +1,169 @@
+import json
+import random
+import statistics
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, connections, transaction
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from blog.benchmarking import temporary_cache, temporary_database
+from blog.generator import Generator
+from blog.models import Comment, Post, User
+from blog.sqlite import pragma
+
+# Настройки SQLite по умолчанию: журнал отката, synchronous=FULL,
+# ожидание блокировки — таймаут модуля sqlite3 в 5 секунд, транзакции
+# начинаются обычным BEGIN.
+BASELINE = {
+    'BLOG_SQLITE_PRAGMAS': {'journal_mode': 'delete'},
+    'BLOG_SQLITE_IMMEDIATE_TRANSACTIONS': False,
+}
+
+
+def summary(latencies, elapsed):
+    latencies = sorted(latencies)
+    result = {
+        'operations': len(latencies),
+        'per_second': round(len(latencies) / elapsed, 1),
+    }
+    if len(latencies) > 1:
+        result['p50_ms'] = round(statistics.median(latencies) * 1000, 2)
+        result['p99_ms'] = round(
+            statistics.quantiles(latencies, n=100)[98] * 1000, 2
+        )
+    return result
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность читателей и писателей SQLite '
+        'с настройками по умолчанию и с BLOG_SQLITE_PRAGMAS и '
+        'BLOG_SQLITE_IMMEDIATE_TRANSACTIONS. Для каждого '
+        'режима создаёт отдельные временные базу и кэш и печатает JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--readers', type=int, default=8,
+            help='Потоков, читающих ленту и комментарии.',
+        )
+        parser.add_argument(
+            '--writers', type=int, default=2,
+            help='Потоков, добавляющих комментарии.',
+        )
+        parser.add_argument(
+            '--duration', type=float, default=5,
+            help='Сколько секунд длится каждый замер.',
+        )
+        parser.add_argument('--posts', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, readers, writers, duration, posts, seed,
+               **options):
+        report = {
+            'readers': readers,
+            'writers': writers,
+            'duration': duration,
+            'modes': {},
+        }
+        for mode, options in (('default', BASELINE), ('tuned', {
+            'BLOG_SQLITE_PRAGMAS': settings.BLOG_SQLITE_PRAGMAS,
+            'BLOG_SQLITE_IMMEDIATE_TRANSACTIONS': True,
+        })):
+            with override_settings(**options), temporary_cache():
+                report['modes'][mode] = self.measure(
+                    readers, writers, duration, posts, seed
+                )
+        default, tuned = report['modes']['default'], report['modes']['tuned']
+        report['speedup'] = {
+            kind: round(
+                tuned[kind]['per_second']
+                / max(default[kind]['per_second'], 0.1), 2
+            ) for kind in ('reads', 'writes')
+        }
+        self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
+
+    def measure(self, readers, writers, duration, posts, seed):
+        with temporary_database():
+            Generator(seed=seed).generate(
+                users=50, categories=5, locations=10, posts=posts,
+                comments=posts * 3,
+            )
+            post_ids = list(Post.objects.values_list('pk', flat=True))
+            user_ids = list(User.objects.values_list('pk', flat=True))
+            journal_mode = pragma(connection, 'journal_mode')
+            connections.close_all()
+            result = self.run_threads(
+                readers, writers, duration, post_ids, user_ids, seed
+            )
+            result['journal_mode'] = journal_mode
+            return result
+
+    def run_threads(self, readers, writers, duration, post_ids, user_ids,
+                    seed):
+        deadline = time.perf_counter() + duration
+        latencies = {'reads': [], 'writes': []}
+        errors = Counter()
+        lock = threading.Lock()
+
+        def read(rng):
+            list(Post.objects.select_related(
+                'author', 'category', 'location'
+            ).filter(
+                is_published=True, pub_date__lte=timezone.now()
+            ).order_by('-pub_date')[:10])
+            list(Comment.objects.filter(
+                post_id=rng.choice(post_ids)
+            ).select_related('author')[:20])
+
+        def write(rng):
+            # Как CommentCreateView: чтение публикации и запись в одной
+            # транзакции.
+            with transaction.atomic():
+                Comment.objects.create(
+                    post=Post.objects.get(pk=rng.choice(post_ids)),
+                    author_id=rng.choice(user_ids),
+                    text='Комментарий из бенчмарка',
+                )
+
+        def worker(kind, operation, number):
+            rng = random.Random(f'{seed}-{kind}-{number}')
+            done = []
+            try:
+                while time.perf_counter() < deadline:
+                    started = time.perf_counter()
+                    try:
+                        operation(rng)
+                    except OperationalError as error:
+                        with lock:
+                            errors[f'{kind}: {error}'] += 1
+                        continue
+                    done.append(time.perf_counter() - started)
+            finally:
+                connection.close()
+            with lock:
+                latencies[kind] += done
+
+        threads = [
+            threading.Thread(target=worker, args=('reads', read, number))
+            for number in range(readers)
+        ] + [
+            threading.Thread(target=worker, args=('writes', write, number))
+            for number in range(writers)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        return {
+            'reads': summary(latencies['reads'], elapsed),
+            'writes': summary(latencies['writes'], elapsed),
+            'errors': dict(errors),
+        }
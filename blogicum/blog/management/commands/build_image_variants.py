@@ -0,0 +1,56 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils import timezone
+
+from blog.images import safe_build_variants
+from blog.models import Post
+from blog.moderation import chunks
+from blog.storage import post_image_storage
+
+
+def build(name):
+    return safe_build_variants(name, post_image_storage)
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт уменьшенные копии изображений существующих публикаций '
+        'в пуле процессов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Число процессов, по умолчанию по числу ядер.',
+        )
+        parser.add_argument(
+            '--all', action='store_true', dest='rebuild',
+            help='Пересоздать копии и для уже обработанных изображений.',
+        )
+
+    def handle(self, *args, workers, rebuild, **options):
+        posts = Post.objects.exclude(image='')
+        if not rebuild:
+            posts = posts.filter(image_variants={})
+        # Одинаковые загрузки делят один файл: копии строятся один раз
+        # на имя, а не на каждую публикацию.
+        pending = {}
+        for pk, name in posts.values_list('pk', 'image').iterator():
+            pending.setdefault(name, []).append(pk)
+        connections.close_all()
+        posts_done = 0
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(build, list(pending), chunksize=16)
+            for pks, variants in zip(pending.values(), results):
+                for chunk in chunks(pks):
+                    Post.objects.filter(pk__in=chunk).update(
+                        image_variants=variants, updated_at=timezone.now()
+                    )
+                posts_done += len(pks)
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано изображений: {len(pending)}, '
+            f'публикаций: {posts_done}'
+        ))
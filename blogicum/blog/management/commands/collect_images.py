@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.constaints import IMAGE_GC_GRACE_MINUTES
+from blog.models import Post
+from blog.storage import post_image_storage
+
+
+def referenced_names():
+    '''Оригиналы и копии, на которые ссылаются публикации.'''
+    names = set()
+    for image, variants in Post.objects.exclude(image='').values_list(
+        'image', 'image_variants'
+    ).iterator():
+        names.add(image)
+        names.update(
+            data['name'] for data in variants.values() if 'name' in data
+        )
+    return names
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет картинки публикаций, на которые не ссылается ни одна '
+        'публикация и которые не менялись дольше --grace минут.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace', type=float, default=IMAGE_GC_GRACE_MINUTES,
+            help='Сколько минут не трогать файлы после загрузки.',
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать, что было бы удалено.',
+        )
+
+    def handle(self, *args, grace, dry_run, **options):
+        storage = post_image_storage
+        root = Post._meta.get_field('image').upload_to.rstrip('/')
+        if not storage.exists(root):
+            return
+        cutoff = timezone.now() - timedelta(minutes=grace)
+        # Файлы перечисляются до чтения ссылок: всё, что появится
+        # позже, моложе cutoff и не удаляется.
+        candidates = [
+            name for name in storage.walk(root)
+            if storage.get_modified_time(name) < cutoff
+        ]
+        referenced = referenced_names()
+        deleted = 0
+        for name in candidates:
+            # Повторная загрузка могла обновить файл после перечисления,
+            # а её публикация ещё не зафиксирована.
+            if name in referenced or (
+                storage.get_modified_time(name) >= cutoff
+            ):
+                continue
+            if dry_run:
+                self.stdout.write(name)
+            else:
+                storage.delete(name)
+            deleted += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Файлов без ссылок: {deleted}'
+        ))
@@ -0,0 +1,47 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.text import compress_sequence
+
+from blog.export import EXPORTS, FORMATS, export_lines, parse_since
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково выгружает публикации или комментарии в NDJSON или CSV. '
+        'С --since выгружаются только записи, созданные с этого момента.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(EXPORTS))
+        parser.add_argument(
+            '--format', choices=sorted(FORMATS), default='ndjson'
+        )
+        parser.add_argument(
+            '--since', help='Дата или дата и время в ISO 8601.'
+        )
+        parser.add_argument(
+            '--output', default='-',
+            help='Файл для выгрузки, по умолчанию стандартный вывод.',
+        )
+        parser.add_argument(
+            '--gzip', action='store_true', help='Сжимать выгрузку gzip.'
+        )
+
+    def handle(self, *args, kind, format, since, output, gzip, **options):
+        try:
+            since = parse_since(since)
+        except ValueError as error:
+            raise CommandError(error)
+        content = export_lines(kind, format, since)
+        if gzip:
+            content = compress_sequence(content)
+        if output == '-':
+            stream = sys.stdout.buffer
+            for chunk in content:
+                stream.write(chunk)
+            stream.flush()
+            return
+        with open(output, 'wb') as stream:
+            for chunk in content:
+                stream.write(chunk)
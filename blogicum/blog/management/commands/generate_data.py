@@ -0,0 +1,67 @@
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from blog.generator import Generator
+
+
+class Command(BaseCommand):
+    help = (
+        'Наполняет базу синтетическими пользователями, категориями, '
+        'местами, публикациями и комментариями для нагрузочных тестов. '
+        'С одинаковыми --seed и --anchor данные получаются одинаковыми.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--categories', type=int, default=50)
+        parser.add_argument('--locations', type=int, default=500)
+        parser.add_argument('--posts', type=int, default=1_000_000)
+        parser.add_argument('--comments', type=int, default=10_000_000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--anchor', type=datetime.fromisoformat,
+            help='Момент «сейчас» для дат публикаций, ISO 8601.',
+        )
+        parser.add_argument(
+            '--days', type=int, default=3 * 365,
+            help='За сколько дней в прошлое разбросаны публикации.',
+        )
+        parser.add_argument(
+            '--unpublished', type=float, default=0.05,
+            help='Доля снятых с публикации записей.',
+        )
+        parser.add_argument(
+            '--scheduled', type=float, default=0.02,
+            help='Доля отложенных публикаций с датой в будущем.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=10000,
+            help='Сколько записей сохранять в одной транзакции.',
+        )
+
+    def handle(self, *args, users, categories, locations, posts, comments,
+               seed, anchor, days, unpublished, scheduled, batch_size,
+               **options):
+        if users < 1:
+            raise CommandError('Нужен хотя бы один пользователь.')
+        if anchor is not None and timezone.is_naive(anchor):
+            anchor = timezone.make_aware(anchor)
+        started = time.perf_counter()
+        generator = Generator(
+            seed=seed, anchor=anchor, batch_size=batch_size,
+            unpublished=unpublished, scheduled=scheduled, days=days,
+            log=lambda message: self.stdout.write(
+                f'[{time.perf_counter() - started:7.1f} с] {message}'
+            ),
+        )
+        summary = generator.generate(
+            users, categories, locations, posts, comments
+        )
+        self.stdout.write(self.style.SUCCESS(
+            'Создано: ' + ', '.join(
+                f'{name} {count}' for name, count in summary.items()
+            )
+        ))
@@ -0,0 +1,52 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.importer import DumpError, Importer
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково загружает категории, места, публикации и комментарии '
+        'из дампа в формате dumpdata или NDJSON. Прерванный импорт '
+        'продолжается с места остановки при повторном запуске.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл с дампом.')
+        parser.add_argument(
+            '--journal',
+            help='Файл журнала импорта, по умолчанию <path>.import.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Сколько записей сохранять в одной транзакции.',
+        )
+        parser.add_argument(
+            '--restart', action='store_true',
+            help='Забыть прошлый прогресс и начать импорт заново.',
+        )
+
+    def handle(self, *args, path, journal, batch_size, restart, **options):
+        if not os.path.isfile(path):
+            raise CommandError(f'Файл не найден: {path}')
+        journal = journal or f'{path}.import'
+        if restart and os.path.exists(journal):
+            os.remove(journal)
+        started = time.perf_counter()
+        importer = Importer(
+            path, journal_path=journal, batch_size=batch_size,
+            log=lambda message: self.stdout.write(
+                f'[{time.perf_counter() - started:7.1f} с] {message}'
+            ),
+        )
+        try:
+            totals = importer.run()
+        except DumpError as error:
+            raise CommandError(error)
+        self.stdout.write(self.style.SUCCESS(
+            'Итого: ' + ', '.join(
+                f'{name} {count}' for name, count in sorted(totals.items())
+            )
+        ))
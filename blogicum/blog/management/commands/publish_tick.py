@@ -0,0 +1,50 @@
+import time
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.scheduling import next_publication, release_due_posts
+
+LAST_TICK_KEY = 'blog:publish-tick'
+
+
+class Command(BaseCommand):
+    help = (
+        'Сбрасывает кэши лент в момент выхода отложенных публикаций. '
+        'Спит до ближайшей pub_date, но не дольше --max-sleep секунд. '
+        'Сброс доходит до сервера только через общий кэш '
+        '(проверка blog.E001).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-sleep', type=float, default=60,
+            help='Наибольшая пауза между проверками, в секундах.',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить одну проверку и выйти.',
+        )
+
+    def handle(self, *args, max_sleep, once, **options):
+        last_tick = cache.get(LAST_TICK_KEY) or (
+            timezone.now() - timedelta(seconds=max_sleep)
+        )
+        while True:
+            now = timezone.now()
+            released = release_due_posts(last_tick, now)
+            if released:
+                self.stdout.write(
+                    f'{now:%Y-%m-%d %H:%M:%S}: вышло публикаций: {released}'
+                )
+            last_tick = now
+            cache.set(LAST_TICK_KEY, last_tick, None)
+            if once:
+                return
+            upcoming = next_publication()
+            delay = max_sleep if upcoming is None else min(
+                max_sleep, (upcoming - timezone.now()).total_seconds()
+            )
+            time.sleep(max(delay, 0))
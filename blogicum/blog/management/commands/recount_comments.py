@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.models import Post
+from blog.moderation import chunked_pks, recount_comments
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает количество комментариев у публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=10000,
+            help='Сколько публикаций обновлять за одну транзакцию.',
+        )
+
+    def handle(self, *args, batch_size, **options):
+        updated = 0
+        for pks in chunked_pks(Post.objects.all(), batch_size):
+            with transaction.atomic():
+                recount_comments(pks)
+            updated += len(pks)
+        self.stdout.write(
+            self.style.SUCCESS(f'Обновлено публикаций: {updated}')
+        )
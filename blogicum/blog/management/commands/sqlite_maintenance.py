@@ -0,0 +1,88 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from blog.sqlite import pragma
+
+INCREMENTAL = 2
+
+
+class Command(BaseCommand):
+    help = (
+        'Обслуживание базы SQLite: ANALYZE, PRAGMA optimize, перенос '
+        'журнала WAL в базу и возврат свободных страниц через '
+        'incremental_vacuum. Запускать по расписанию, например раз в сутки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument(
+            '--skip-analyze', action='store_true',
+            help='Не пересобирать статистику полностью, только optimize.',
+        )
+        parser.add_argument(
+            '--vacuum-pages', type=int, default=0,
+            help='Сколько свободных страниц вернуть; 0 — все.',
+        )
+        parser.add_argument(
+            '--enable-incremental-vacuum', action='store_true',
+            help=(
+                'Включить auto_vacuum=INCREMENTAL. База переписывается '
+                'целиком через VACUUM и на это время блокируется.'
+            ),
+        )
+
+    def handle(self, *args, database, skip_analyze, vacuum_pages,
+               enable_incremental_vacuum, **options):
+        connection = connections[database]
+        if connection.vendor != 'sqlite':
+            raise CommandError('Команда работает только с SQLite.')
+        self.connection = connection
+        if enable_incremental_vacuum:
+            self.step('auto_vacuum = INCREMENTAL', (
+                'PRAGMA auto_vacuum = INCREMENTAL', 'VACUUM'
+            ))
+        if not skip_analyze:
+            self.step('ANALYZE', ('ANALYZE',))
+        self.step('PRAGMA optimize', ('PRAGMA optimize',))
+        busy, log, checkpointed = self.step(
+            'WAL checkpoint', ('PRAGMA wal_checkpoint(TRUNCATE)',)
+        )
+        if busy:
+            self.stdout.write(self.style.WARNING(
+                f'  журнал перенесён не полностью: {checkpointed} из {log} '
+                'страниц, базу держат другие соединения'
+            ))
+        free = pragma(connection, 'freelist_count')
+        if pragma(connection, 'auto_vacuum') == INCREMENTAL:
+            self.step('incremental_vacuum', (
+                f'PRAGMA incremental_vacuum({vacuum_pages or free})',
+            ))
+            self.stdout.write(
+                f'  свободных страниц: {free} → '
+                f'{pragma(connection, "freelist_count")}'
+            )
+        elif free:
+            self.stdout.write(self.style.WARNING(
+                f'  свободных страниц: {free}; incremental_vacuum выключен, '
+                'включите его флагом --enable-incremental-vacuum'
+            ))
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово: {pragma(connection, "page_count")} страниц по '
+            f'{pragma(connection, "page_size")} байт'
+        ))
+
+    def step(self, title, statements):
+        '''Выполняет запросы и печатает время; возвращает последнюю строку.'''
+        started = time.perf_counter()
+        with self.connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+                row = cursor.fetchone()
+                while cursor.fetchone() is not None:
+                    pass
+        self.stdout.write(
+            f'{title}: {(time.perf_counter() - started) * 1000:.0f} мс'
+        )
+        return row
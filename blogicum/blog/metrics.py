@@ -0,0 +1,172 @@
+import json
+import os
+from bisect import bisect_left
+from collections import Counter
+from pathlib import Path
+from threading import Lock
+from time import monotonic
+
+from django.conf import settings
+
+from .cache import post_card_stats
+from .constaints import METRICS_FLUSH_SECONDS
+
+SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERIES = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+BYTES = (1024, 4096, 16384, 65536, 262144, 1048576)
+
+HISTOGRAMS = (
+    ('duration', 'blog_request_duration_seconds',
+     'Время обработки запроса целиком.', SECONDS),
+    ('db_queries', 'blog_request_db_queries',
+     'Число SQL-запросов за запрос.', QUERIES),
+    ('db_time', 'blog_request_db_seconds',
+     'Время SQL-запросов за запрос.', SECONDS),
+    ('render_time', 'blog_request_render_seconds',
+     'Время отрисовки шаблона.', SECONDS),
+    ('size', 'blog_response_size_bytes',
+     'Размер тела ответа.', BYTES),
+)
+
+
+class Histogram:
+    '''Гистограмма с фиксированными границами корзин, как в Prometheus.'''
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def dump(self):
+        return {'counts': self.counts, 'sum': self.sum, 'count': self.count}
+
+    def merge(self, data):
+        self.counts = [a + b for a, b in zip(self.counts, data['counts'])]
+        self.sum += data['sum']
+        self.count += data['count']
+
+    def lines(self, name, labels):
+        cumulative = 0
+        for bound, count in zip((*self.buckets, '+Inf'), self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+        yield f'{name}_sum{{{labels}}} {self.sum}'
+        yield f'{name}_count{{{labels}}} {self.count}'
+
+
+def escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '')
+
+
+def new_histograms():
+    return {key: Histogram(buckets) for key, _, _, buckets in HISTOGRAMS}
+
+
+class Registry:
+    '''Гистограммы запросов по имени URL.
+
+    Замеры копятся в памяти процесса. Если задана настройка
+    BLOG_METRICS_DIR, каждый воркер не реже раза в METRICS_FLUSH_SECONDS
+    сбрасывает свои счётчики в файл <pid>.json этого каталога, а
+    страница метрик суммирует все файлы: какой бы воркер ни ответил
+    сборщику, он отдаст общие значения. Файлы завершившихся воркеров
+    остаются и продолжают входить в сумму, поэтому счётчики не убывают
+    при перезапуске. Без каталога страница показывает только замеры
+    ответившего процесса.
+    '''
+
+    def __init__(self):
+        self.lock = Lock()
+        self.views = {}
+        self.flushed = monotonic()
+
+    def observe(self, view, **values):
+        with self.lock:
+            histograms = self.views.get(view)
+            if histograms is None:
+                histograms = self.views[view] = new_histograms()
+            for key, value in values.items():
+                if value is not None:
+                    histograms[key].observe(value)
+        if monotonic() - self.flushed >= METRICS_FLUSH_SECONDS:
+            self.flush()
+
+    def clear(self):
+        with self.lock:
+            self.views.clear()
+
+    def dump(self):
+        with self.lock:
+            return {
+                'views': {
+                    view: {
+                        key: histogram.dump()
+                        for key, histogram in histograms.items()
+                    }
+                    for view, histograms in self.views.items()
+                },
+                'post_card': dict(post_card_stats),
+            }
+
+    def flush(self):
+        '''Сохраняет счётчики процесса в общий каталог, если он задан.'''
+        self.flushed = monotonic()
+        directory = settings.BLOG_METRICS_DIR
+        if not directory:
+            return
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f'{os.getpid()}.json'
+        temporary = path.with_suffix('.tmp')
+        temporary.write_text(json.dumps(self.dump()))
+        os.replace(temporary, path)
+
+    def collect(self):
+        '''Сумма счётчиков всех воркеров или только этого процесса.'''
+        directory = settings.BLOG_METRICS_DIR
+        if not directory:
+            snapshots = [self.dump()]
+        else:
+            self.flush()
+            snapshots = []
+            for path in Path(directory).glob('*.json'):
+                try:
+                    snapshots.append(json.loads(path.read_text()))
+                except (OSError, ValueError):
+                    continue
+        views, post_card = {}, Counter()
+        for snapshot in snapshots:
+            for view, data in snapshot['views'].items():
+                histograms = views.setdefault(view, new_histograms())
+                for key, histogram in data.items():
+                    histograms[key].merge(histogram)
+            post_card.update(snapshot['post_card'])
+        return views, post_card
+
+    def render(self):
+        views, post_card = self.collect()
+        lines = []
+        for key, name, help_text, _ in HISTOGRAMS:
+            lines += [
+                f'# HELP {name} {help_text}',
+                f'# TYPE {name} histogram',
+            ]
+            for view, histograms in sorted(views.items()):
+                lines += histograms[key].lines(
+                    name, f'view="{escape(view)}"'
+                )
+        for name, value in sorted(post_card.items()):
+            lines += [
+                f'# TYPE blog_post_card_cache_{name}_total counter',
+                f'blog_post_card_cache_{name}_total {value}',
+            ]
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
@@ -0,0 +1,65 @@
+from time import perf_counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+from .metrics import registry
+
+
+class ServerTimingMiddleware:
+    '''Замеряет запрос и отдаёт замеры в заголовке Server-Timing.
+
+    Считаются общее время, число и время SQL-запросов, время отрисовки
+    шаблона и размер ответа; всё это копится в гистограммах по имени
+    URL (см. blog.metrics). Отключается настройкой BLOG_REQUEST_METRICS.
+    '''
+
+    def __init__(self, get_response):
+        if not settings.BLOG_REQUEST_METRICS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timing = request._server_timing = {
+            'db_queries': 0, 'db_time': 0.0, 'render_time': None,
+        }
+
+        def record_query(execute, sql, params, many, context):
+            started = perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                timing['db_queries'] += 1
+                timing['db_time'] += perf_counter() - started
+
+        started = perf_counter()
+        with connection.execute_wrapper(record_query):
+            response = self.get_response(request)
+        duration = perf_counter() - started
+
+        metrics = [
+            f'app;dur={duration * 1000:.1f}',
+            f'db;dur={timing["db_time"] * 1000:.1f};'
+            f'desc="{timing["db_queries"]} queries"',
+        ]
+        if timing['render_time'] is not None:
+            metrics.append(f'render;dur={timing["render_time"] * 1000:.1f}')
+        response['Server-Timing'] = ', '.join(metrics)
+        match = request.resolver_match
+        registry.observe(
+            match.view_name if match else 'unresolved',
+            duration=duration,
+            size=None if response.streaming else len(response.content),
+            **timing,
+        )
+        return response
+
+    def process_template_response(self, request, response):
+        started = perf_counter()
+
+        def rendered(response):
+            request._server_timing['render_time'] = perf_counter() - started
+
+        response.add_post_render_callback(rendered)
+        return response
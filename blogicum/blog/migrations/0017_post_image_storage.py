@@ -0,0 +1,19 @@
+# Generated by Django 3.2.16 on 2026-10-17 07:08
+
+import blog.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0016_post_image_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, db_index=True, storage=blog.storage.ContentAddressedStorage(), upload_to='posts_images/'),
+        ),
+    ]
@@ -1,11 +1,38 @@
-from django.shortcuts import redirect, reverse
+from hashlib import md5
 
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404, redirect, reverse
+from django.utils import timezone
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, quote_etag
+)
 
-class PostMixin:
+from .cache import feed_count_key, page_cache_key
+from .constaints import NUMBER_OF_COMMENTS
+from .models import Post
+from .paginators import CachedCountPaginator, KeysetPaginator
+from .scheduling import cache_timeout, feed_valid_until
+
+
+class CachedObjectMixin:
+    '''Запоминает объект на время запроса, чтобы не читать его дважды.'''
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_cached_object'):
+            self._cached_object = super().get_object()
+        return self._cached_object
+
+
+class PostMixin(CachedObjectMixin):
 
     def dispatch(self, request, *args, **kwargs):
         post = self.get_object()
-        if post.author != request.user:
+        if post.author_id != request.user.pk:
             return redirect('blog:post_detail', pk=post.pk)
         return super().dispatch(request, *args, **kwargs)
 
@@ -25,9 +52,157 @@ class GetProfileMixin:
         )
 
 
-class DispatchCommentMixin:
+class DispatchCommentMixin(CachedObjectMixin):
     def dispatch(self, request, *args, **kwargs):
         self.object = self.get_object()
-        if self.object.author != request.user:
+        if self.object.author_id != request.user.pk:
             return redirect('blog:post_detail', self.object.post_id)
         return super().dispatch(request, *args, **kwargs)
+
+
+class FeedPaginationMixin:
+    cursor_kwarg = 'cursor'
+    paginator_class = CachedCountPaginator
+
+    def get_feed_key(self):
+        return None
+
+    def get_scheduled_posts(self):
+        return Post.objects.none()
+
+    def get_cache_timeout(self, timeout):
+        feed = self.get_feed_key()
+        if feed is None:
+            return timeout
+        return cache_timeout(
+            feed_valid_until(feed, self.get_scheduled_posts()), timeout
+        )
+
+    def get_paginator(self, *args, **kwargs):
+        feed = self.get_feed_key()
+        return super().get_paginator(
+            *args,
+            cache_key=feed and feed_count_key(*feed),
+            timeout=self.get_cache_timeout(settings.BLOG_FEED_COUNT_TIMEOUT),
+            **kwargs
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        if not settings.BLOG_KEYSET_PAGINATION:
+            return super().paginate_queryset(queryset, page_size)
+        paginator = KeysetPaginator(queryset, page_size)
+        page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class AnonymousPageCacheMixin:
+    cached_query_params = ('page', 'cursor')
+    cached_headers = ('ETag', 'Cache-Control')
+
+    def get_cache_timeout(self, timeout):
+        return timeout
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+        key = page_cache_key(request.path, tuple(
+            request.GET.get(param) for param in self.cached_query_params
+        ))
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type, headers = cached
+            response = HttpResponse(content, content_type=content_type)
+            for header, value in headers.items():
+                response[header] = value
+            return get_conditional_response(
+                request, etag=headers.get('ETag'), response=response
+            ) or response
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200:
+            response.add_post_render_callback(
+                lambda response: cache.set(
+                    key,
+                    (response.content, response['Content-Type'], {
+                        header: response[header]
+                        for header in self.cached_headers
+                        if response.has_header(header)
+                    }),
+                    self.get_cache_timeout(settings.BLOG_PAGE_CACHE_TIMEOUT),
+                )
+            )
+        return response
+
+
+def post_validator(post):
+    '''Всё, что меняет карточку или страницу публикации.'''
+    author = post.author
+    return (
+        post.pk, post.updated_at, post.pub_date, post.comment_count,
+        author.username, author.get_full_name(),
+        post.category and post.category.updated_at,
+        post.location and post.location.updated_at,
+    )
+
+
+def page_validator(page):
+    '''Положение страницы и ссылки на соседние.'''
+    paginator = getattr(page, 'paginator', None)
+    return (
+        getattr(page, 'number', None), page.has_previous(), page.has_next(),
+        getattr(paginator, 'num_pages', None),
+    )
+
+
+class ConditionalGetMixin:
+    '''Отвечает анонимам 304, если данные страницы не изменились.
+
+    ETag считается по ключам и updated_at записей, которые и так
+    загружены для страницы; при совпадении шаблон не отрисовывается.
+    Last-Modified не отправляется: удаление или снятие публикации со
+    страницы не сдвинуло бы самый поздний updated_at. Для вошедших
+    пользователей страница зависит от них самих, и проверка не
+    выполняется.
+    '''
+
+    def get_validators(self, context):
+        '''Кортежи с ключами и updated_at всего, что есть на странице.'''
+        return ()
+
+    def get(self, request, *args, **kwargs):
+        response = super().get(request, *args, **kwargs)
+        if request.user.is_authenticated or response.status_code != 200:
+            return response
+        validators = list(self.get_validators(response.context_data))
+        etag = quote_etag(md5(repr(validators).encode()).hexdigest())
+        response['ETag'] = etag
+        # Без этого браузеры и прокси держат страницу по эвристике
+        # свежести и не присылают If-None-Match.
+        patch_cache_control(response, no_cache=True)
+        return get_conditional_response(
+            request, etag=etag, response=response
+        ) or response
+
+
+class PostCommentsMixin:
+    comments_cursor_kwarg = 'cursor'
+
+    def get_visible_post(self):
+        '''Публикация, если она опубликована или принадлежит автору.'''
+        visible = Q(
+            is_published=True,
+            category__is_published=True,
+            pub_date__lte=timezone.now(),
+        )
+        if self.request.user.is_authenticated:
+            visible |= Q(author=self.request.user)
+        return get_object_or_404(
+            Post.objects.select_related('author', 'category', 'location'),
+            visible,
+            pk=self.kwargs['pk'],
+        )
+
+    def get_comments_page(self, post, cursor=None):
+        return KeysetPaginator(
+            post.comments.select_related('author'), NUMBER_OF_COMMENTS,
+            key='created_at', reverse=False,
+        ).page(cursor)
@@ -3,6 +3,7 @@ from django.contrib.auth import get_user_model
 from django.db import models
 
 from .constaints import NUMBER_OF_CHARACTERS
+from .storage import post_image_storage
 
 User = get_user_model()
 
@@ -70,6 +71,7 @@ class Post(BaseModel):
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
+        db_index=False,
         verbose_name='Автор публикации',
     )
     location = models.ForeignKey(
@@ -87,14 +89,45 @@ class Post(BaseModel):
     )
     image = models.ImageField(
         upload_to='posts_images/',
+        storage=post_image_storage,
+        db_index=True,
         blank=True
     )
+    image_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name='Уменьшенные копии изображения',
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев',
+    )
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date',)
         default_related_name = 'posts'
+        indexes = (
+            models.Index(
+                fields=('pub_date',),
+                condition=models.Q(is_published=True),
+                name='post_published_feed_idx',
+            ),
+            models.Index(
+                fields=('category', 'pub_date'),
+                condition=models.Q(is_published=True),
+                name='post_category_feed_idx',
+            ),
+            models.Index(
+                fields=('author', 'pub_date'),
+                name='post_author_feed_idx',
+            ),
+            models.Index(fields=('pub_date',), name='post_pub_date_idx'),
+            models.Index(fields=('created_at',), name='post_created_idx'),
+        )
 
     def __str__(self):
         return self.title[:NUMBER_OF_CHARACTERS]
@@ -107,6 +140,7 @@ class Comment(models.Model):
     post = models.ForeignKey(
         Post,
         on_delete=models.CASCADE,
+        db_index=False,
         related_name='comments'
     )
     author = models.ForeignKey(
@@ -118,15 +152,26 @@ class Comment(models.Model):
         auto_now_add=True,
         verbose_name='Дата и время публикации'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено'
+    )
 
     class Meta:
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at'),
+                name='comment_thread_idx',
+            ),
+            models.Index(fields=('created_at',), name='comment_created_idx'),
+        )
 
     def __str__(self):
         return (
             f'{self.author}: '
-            f'{self.post[:NUMBER_OF_CHARACTERS]}, '
+            f'{self.post}, '
             f'{self.text[:NUMBER_OF_CHARACTERS]}'
         )
@@ -0,0 +1,124 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import connections, transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .constaints import BULK_CHUNK_SIZE
+from .models import Comment, Post
+
+# Один сигнал на всё массовое изменение вместо post_save/post_delete на
+# каждую строку; аргумент pks — первичные ключи затронутых записей.
+bulk_changed = Signal()
+
+_deleting_post_ids = ContextVar('deleting_post_ids', default=frozenset())
+
+
+def deleting_post_ids():
+    '''Публикации, которые сейчас удаляются вместе с комментариями.'''
+    return _deleting_post_ids.get()
+
+
+@contextmanager
+def deleting_posts(post_ids):
+    '''Удаление публикаций без пересчёта и сброса кэша на каждый комментарий.
+
+    Публикация сама сбрасывает свои страницы и ленты в post_delete.
+    Набор снимается в finally, даже если удаление не удалось; удаления
+    вне этого блока (например, каскад от пользователя) просто идут
+    медленным путём.
+    '''
+    token = _deleting_post_ids.set(deleting_post_ids() | set(post_ids))
+    try:
+        yield
+    finally:
+        _deleting_post_ids.reset(token)
+
+
+def chunks(items, size=BULK_CHUNK_SIZE):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def chunked_pks(queryset, size=BULK_CHUNK_SIZE):
+    '''Первичные ключи queryset порциями, без OFFSET.'''
+    queryset = queryset.order_by('pk').values_list('pk', flat=True)
+    last_pk = None
+    while True:
+        page = queryset if last_pk is None else queryset.filter(
+            pk__gt=last_pk
+        )
+        pks = list(page[:size])
+        if not pks:
+            return
+        yield pks
+        last_pk = pks[-1]
+
+
+def set_published(queryset, is_published):
+    '''Меняет is_published одним UPDATE на порцию; возвращает число строк.'''
+    model = queryset.model
+    changed = []
+    for pks in chunked_pks(queryset.exclude(is_published=is_published)):
+        with transaction.atomic():
+            # update() не заполняет auto_now, поэтому updated_at — явно.
+            model.objects.filter(pk__in=pks).update(
+                is_published=is_published, updated_at=timezone.now()
+            )
+        changed += pks
+    if changed:
+        bulk_changed.send(sender=model, pks=changed)
+    return len(changed)
+
+
+def recount_comments(post_ids):
+    '''Пересчитывает comment_count у перечисленных публикаций.'''
+    counts = Comment.objects.filter(
+        post=OuterRef('pk')
+    ).order_by().values('post').annotate(total=Count('pk')).values('total')
+    for chunk in chunks(post_ids):
+        Post.objects.filter(pk__in=chunk).update(
+            comment_count=Coalesce(Subquery(counts), 0)
+        )
+
+
+def delete_rows(model, pks, using):
+    '''Удаляет строки одним DELETE ... WHERE pk IN (...).
+
+    Без сборщика удаления и построчных сигналов: годится для моделей,
+    на которые никто не ссылается; изменения объявляет bulk_changed.
+    '''
+    meta = model._meta
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {quote(meta.db_table)} '
+            f'WHERE {quote(meta.pk.column)} IN '
+            f'({", ".join(["%s"] * len(pks))})',
+            pks,
+        )
+        return cursor.rowcount
+
+
+def delete_comments(queryset):
+    '''Удаляет комментарии порциями и пересчитывает их число у публикаций.'''
+    deleted = []
+    post_ids = set()
+    for pks in chunked_pks(queryset):
+        comments = Comment.objects.filter(pk__in=pks)
+        with transaction.atomic():
+            chunk_post_ids = set(
+                comments.values_list('post_id', flat=True).distinct()
+            )
+            delete_rows(Comment, pks, comments.db)
+            recount_comments(chunk_post_ids)
+        deleted += pks
+        post_ids |= chunk_post_ids
+    if deleted:
+        bulk_changed.send(sender=Comment, pks=deleted, post_ids=post_ids)
+    return len(deleted)
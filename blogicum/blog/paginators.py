@@ -0,0 +1,201 @@
+import base64
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Paginator
+from django.db.models import Q
+from django.http import Http404
+from django.utils.functional import cached_property
+
+NEXT = 'next'
+PREVIOUS = 'prev'
+
+
+def encode_cursor(moment, pk, direction):
+    '''Непрозрачный токен позиции по ключу (дата, id).'''
+    raw = json.dumps([moment.isoformat(), pk, direction])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        padding = '=' * (-len(token) % 4)
+        moment, pk, direction = json.loads(
+            base64.urlsafe_b64decode(token + padding)
+        )
+        if direction not in (NEXT, PREVIOUS):
+            raise ValueError(direction)
+        return datetime.fromisoformat(moment), int(pk), direction
+    except (TypeError, ValueError):
+        raise Http404('Неверный курсор страницы')
+
+
+class CachedCountPaginator(Paginator):
+    '''Пагинатор, хранящий число записей ленты в кэше.
+
+    Число точное: по нему проверяется номер страницы, и урезанная
+    оценка сделала бы старые публикации недоступными. Полный COUNT(*)
+    выполняется один раз до сброса кэша ленты.
+    '''
+
+    def __init__(self, *args, cache_key=None, timeout=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_key = cache_key
+        self.timeout = (
+            settings.BLOG_FEED_COUNT_TIMEOUT if timeout is None else timeout
+        )
+
+    @cached_property
+    def count(self):
+        if self.cache_key is None:
+            return self.object_list.count()
+        count = cache.get(self.cache_key)
+        if count is None:
+            count = self.object_list.order_by().count()
+            cache.set(self.cache_key, count, self.timeout)
+        return count
+
+
+class LimitedCountPaginator(Paginator):
+    '''Пагинатор, который считает записи не дальше BLOG_ADMIN_COUNT_LIMIT.
+
+    Полный COUNT(*) по огромной таблице не выполняется: если записей
+    больше предела, count равен пределу, а is_capped истинно. Страницы
+    за пределом всё равно открываются — номер проверяется по тому,
+    есть ли на странице записи, — и в ссылках есть следующая страница.
+    '''
+
+    @cached_property
+    def _counted(self):
+        return self.object_list.order_by()[
+            :settings.BLOG_ADMIN_COUNT_LIMIT + 1
+        ].count()
+
+    @property
+    def is_capped(self):
+        return self._counted > settings.BLOG_ADMIN_COUNT_LIMIT
+
+    @cached_property
+    def count(self):
+        return min(self._counted, settings.BLOG_ADMIN_COUNT_LIMIT)
+
+    def _has_rows(self, number):
+        bottom = (number - 1) * self.per_page
+        return bool(self.object_list[bottom:bottom + 1])
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            number = int(number)
+            if number < 1 or not self.is_capped or not self._has_rows(
+                number
+            ):
+                raise
+            return number
+
+    def page(self, number):
+        if not self.is_capped:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        return self._get_page(
+            self.object_list[bottom:bottom + self.per_page], number, self
+        )
+
+    def get_elided_page_range(self, number=1, **kwargs):
+        number = self.validate_number(number)
+        yield from super().get_elided_page_range(
+            min(number, self.num_pages), **kwargs
+        )
+        if not self.is_capped:
+            return
+        beyond = [number] if number > self.num_pages else []
+        if self._has_rows(max(number, self.num_pages) + 1):
+            beyond.append(max(number, self.num_pages) + 1)
+        if beyond and beyond[0] > self.num_pages + 1:
+            yield self.ELLIPSIS
+        yield from beyond
+
+
+class KeysetPage:
+    '''Страница без общего количества записей.'''
+
+    is_keyset = True
+
+    def __init__(self, object_list, has_next, has_previous, key='pub_date'):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.key = key
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def _cursor(self, obj, direction):
+        return encode_cursor(getattr(obj, self.key), obj.pk, direction)
+
+    @property
+    def next_cursor(self):
+        if self.has_next():
+            return self._cursor(self.object_list[-1], NEXT)
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous():
+            return self._cursor(self.object_list[0], PREVIOUS)
+
+
+class KeysetPaginator:
+    '''Пагинатор по ключу (key, id) вместо OFFSET и COUNT(*).
+
+    По умолчанию записи идут от новых к старым по pub_date.
+    '''
+
+    def __init__(self, object_list, per_page, key='pub_date', reverse=True):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.key = key
+        self.reverse = reverse
+
+    def _slice(self, after, moment=None, pk=None):
+        '''Записи, идущие за (moment, pk) в прямом или обратном порядке.'''
+        descending = self.reverse == after
+        queryset = self.object_list
+        if moment is not None:
+            lookup = 'lt' if descending else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'{self.key}__{lookup}': moment})
+                | Q(**{self.key: moment, f'pk__{lookup}': pk})
+            )
+        ordering = (f'-{self.key}', '-pk') if descending else (self.key, 'pk')
+        objects = list(queryset.order_by(*ordering)[:self.per_page + 1])
+        return objects[:self.per_page], len(objects) > self.per_page
+
+    def page(self, cursor=None):
+        if not cursor:
+            objects, has_next = self._slice(after=True)
+            return KeysetPage(objects, has_next, False, self.key)
+        moment, pk, direction = decode_cursor(cursor)
+        if direction == NEXT:
+            objects, has_next = self._slice(True, moment, pk)
+            return KeysetPage(objects, has_next, True, self.key)
+        objects, has_previous = self._slice(False, moment, pk)
+        return KeysetPage(objects[::-1], True, has_previous, self.key)
@@ -0,0 +1,62 @@
+from math import ceil
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from .cache import (
+    feed_valid_until_key, invalidate_feeds, purge_post_pages
+)
+from .models import Post
+
+NEVER = 'never'
+
+
+def next_publication(posts=None):
+    '''Ближайшая дата выхода отложенной публикации среди posts.'''
+    if posts is None:
+        posts = Post.objects.all()
+    return posts.filter(
+        pub_date__gt=timezone.now()
+    ).order_by('pub_date').values_list('pub_date', flat=True).first()
+
+
+def feed_valid_until(feed, posts):
+    '''Момент, до которого лента feed не изменится сама по себе.
+
+    posts — публикации, которые появятся в ленте, когда наступит их
+    pub_date. Результат кэшируется до этого же момента.
+    '''
+    key = feed_valid_until_key(*feed)
+    valid_until = cache.get(key)
+    if valid_until is None:
+        valid_until = next_publication(posts) or NEVER
+        cache.set(
+            key, valid_until,
+            None if valid_until == NEVER else seconds_until(valid_until),
+        )
+    return None if valid_until == NEVER else valid_until
+
+
+def seconds_until(moment):
+    return max(ceil((moment - timezone.now()).total_seconds()), 1)
+
+
+def cache_timeout(valid_until, timeout):
+    '''Срок жизни кэша, не выходящий за границу valid_until.'''
+    if valid_until is None:
+        return timeout
+    return min(timeout, seconds_until(valid_until))
+
+
+def release_due_posts(since, until):
+    '''Сбрасывает кэши лент, в которые попали публикации из (since, until].'''
+    released = list(Post.objects.filter(
+        pub_date__gt=since, pub_date__lte=until
+    ).values_list('pk', 'category_id', 'author_id'))
+    if released:
+        post_ids, category_ids, author_ids = (set(ids) for ids in zip(
+            *released
+        ))
+        invalidate_feeds(category_ids, author_ids)
+        purge_post_pages(post_ids=post_ids, category_ids=category_ids)
+    return len(released)
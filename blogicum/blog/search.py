@@ -0,0 +1,105 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .constaints import (
+    BULK_CHUNK_SIZE, SEARCH_TEXT_WEIGHT, SEARCH_TITLE_WEIGHT
+)
+
+FTS_TABLE = 'blog_post_fts'
+MAX_TERMS = 10
+TERM = re.compile(r'\w+')
+
+
+def fts_available(using=connection):
+    return using.vendor == 'sqlite'
+
+
+def search_terms(text):
+    return TERM.findall(text.lower())[:MAX_TERMS]
+
+
+def fts_query(terms):
+    '''Запрос FTS5: все слова обязательны, последнее — как префикс.
+
+    Каждое слово берётся в кавычки, поэтому операторы FTS5 из
+    пользовательского ввода не разбираются.
+    '''
+    *words, last = [f'"{term}"' for term in terms]
+    return ' '.join((*words, last + '*'))
+
+
+def search_posts(queryset, text):
+    '''Публикации из queryset, найденные по тексту и упорядоченные по BM25.'''
+    terms = search_terms(text)
+    if not terms:
+        return queryset.none()
+    if not fts_available():
+        condition = Q()
+        for term in terms:
+            condition &= Q(title__icontains=term) | Q(text__icontains=term)
+        return queryset.filter(condition)
+    table = queryset.model._meta.db_table
+    return queryset.extra(
+        select={'rank': (
+            f'bm25({FTS_TABLE}, {SEARCH_TITLE_WEIGHT}, {SEARCH_TEXT_WEIGHT})'
+        )},
+        tables=[FTS_TABLE],
+        where=[f'{FTS_TABLE}.rowid = {table}.id', f'{FTS_TABLE} MATCH %s'],
+        params=[fts_query(terms)],
+    ).order_by('rank', '-pub_date')
+
+
+def index_post(post):
+    if not fts_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post.pk]
+        )
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, text) '
+            'VALUES (%s, %s, %s)',
+            [post.pk, post.title, post.text],
+        )
+
+
+def index_posts(pks):
+    '''Добавляет в индекс новые публикации порциями по pk.'''
+    if not fts_available():
+        return
+    pks = list(pks)
+    with connection.cursor() as cursor:
+        for start in range(0, len(pks), BULK_CHUNK_SIZE):
+            chunk = pks[start:start + BULK_CHUNK_SIZE]
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, text) '
+                'SELECT id, title, text FROM blog_post WHERE id IN ('
+                + ', '.join(['%s'] * len(chunk)) + ')',
+                chunk,
+            )
+
+
+def unindex_post(pk):
+    if not fts_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [pk])
+
+
+def rebuild_index(using=connection):
+    '''Заново наполняет индекс из таблицы публикаций одним запросом.'''
+    if not fts_available(using):
+        return 0
+    with using.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, text) '
+            'SELECT id, title, text FROM blog_post'
+        )
+        indexed = cursor.rowcount
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')"
+        )
+    return indexed
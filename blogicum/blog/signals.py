@@ -0,0 +1,182 @@
+from django.db.backends.signals import connection_created
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+
+from .cache import invalidate_feeds, purge_post_pages
+from .images import safe_build_variants
+from .models import Category, Comment, Location, Post
+from .moderation import bulk_changed, chunks, deleting_post_ids
+from .search import index_post, unindex_post
+from .sqlite import apply_pragmas
+from .storage import post_image_storage
+
+
+def shared_variants(instance):
+    '''Копии той же картинки, уже построенные для другой публикации.'''
+    return Post.objects.filter(image=instance.image.name).exclude(
+        pk=instance.pk
+    ).exclude(image_variants={}).values_list(
+        'image_variants', flat=True
+    ).first()
+
+
+@receiver(post_save, sender=Post)
+def update_image_variants(sender, instance, raw=False, **kwargs):
+    source = instance.image_variants.get('original', {}).get('name')
+    if raw or (instance.image.name or None) == source:
+        return
+    shared = shared_variants(instance) if instance.image else None
+    if shared:
+        # Копии могли давно не меняться; свежая отметка бережёт их от
+        # collect_images, пока публикация не зафиксирована.
+        for data in shared.values():
+            post_image_storage.touch(data['name'])
+    instance.image_variants = (
+        shared
+        or safe_build_variants(instance.image.name, instance.image.storage)
+    ) if instance.image else {}
+    Post.objects.filter(pk=instance.pk).update(
+        image_variants=instance.image_variants
+    )
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, **kwargs):
+    if created:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    if instance.post_id in deleting_post_ids():
+        return
+    Post.objects.filter(pk=instance.post_id, comment_count__gt=0).update(
+        comment_count=F('comment_count') - 1
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def purge_comment_pages(sender, instance, **kwargs):
+    if instance.post_id in deleting_post_ids():
+        return
+    purge_post_pages(
+        post_ids=(instance.post_id,),
+        category_slugs=Category.objects.filter(
+            posts=instance.post_id
+        ).values_list('slug', flat=True),
+    )
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_feeds(sender, instance, **kwargs):
+    instance._previous_feeds = Post.objects.filter(
+        pk=instance.pk
+    ).values('category_id', 'author_id').first() if instance.pk else None
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_feeds(sender, instance, **kwargs):
+    category_ids = {instance.category_id}
+    author_ids = {instance.author_id}
+    previous = getattr(instance, '_previous_feeds', None)
+    if previous:
+        category_ids.add(previous['category_id'])
+        author_ids.add(previous['author_id'])
+    invalidate_feeds(category_ids, author_ids)
+    purge_post_pages(post_ids=(instance.pk,), category_ids=category_ids)
+
+
+@receiver(post_save, sender=Post)
+def update_search_index(sender, instance, **kwargs):
+    index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_search_index(sender, instance, **kwargs):
+    unindex_post(instance.pk)
+
+
+@receiver(pre_save, sender=Category)
+def remember_category_slug(sender, instance, **kwargs):
+    instance._previous_slug = Category.objects.filter(
+        pk=instance.pk
+    ).values_list('slug', flat=True).first() if instance.pk else None
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def invalidate_category_feeds(sender, instance, **kwargs):
+    invalidate_feeds(category_ids=(instance.pk,))
+    purge_post_pages(
+        post_ids=instance.posts.values_list('pk', flat=True).iterator(),
+        category_slugs={
+            instance.slug, getattr(instance, '_previous_slug', None)
+        } - {None},
+    )
+
+
+@receiver(post_save, sender=Location)
+@receiver(pre_delete, sender=Location)
+def purge_location_pages(sender, instance, **kwargs):
+    posts = list(instance.posts.values_list('pk', 'category_id'))
+    purge_post_pages(
+        post_ids=[pk for pk, _ in posts],
+        category_ids={category_id for _, category_id in posts},
+    )
+
+
+@receiver(bulk_changed, sender=Post)
+def invalidate_bulk_posts(sender, pks, **kwargs):
+    category_ids, author_ids = set(), set()
+    for chunk in chunks(pks):
+        for category_id, author_id in Post.objects.filter(
+            pk__in=chunk
+        ).values_list('category_id', 'author_id').distinct():
+            category_ids.add(category_id)
+            author_ids.add(author_id)
+    invalidate_feeds(category_ids, author_ids)
+    purge_post_pages(post_ids=pks, category_ids=category_ids)
+
+
+@receiver(bulk_changed, sender=Category)
+def invalidate_bulk_categories(sender, pks, **kwargs):
+    invalidate_feeds(category_ids=pks)
+    purge_post_pages(
+        post_ids=Post.objects.filter(category__in=pks).values_list(
+            'pk', flat=True
+        ).iterator(),
+        category_ids=pks,
+    )
+
+
+@receiver(bulk_changed, sender=Location)
+def purge_bulk_locations(sender, pks, **kwargs):
+    posts = list(Post.objects.filter(location__in=pks).values_list(
+        'pk', 'category_id'
+    ))
+    purge_post_pages(
+        post_ids=[pk for pk, _ in posts],
+        category_ids={category_id for _, category_id in posts},
+    )
+
+
+@receiver(bulk_changed, sender=Comment)
+def purge_bulk_comments(sender, post_ids, **kwargs):
+    category_ids = set()
+    for chunk in chunks(post_ids):
+        category_ids.update(Post.objects.filter(pk__in=chunk).values_list(
+            'category_id', flat=True
+        ))
+    purge_post_pages(post_ids=post_ids, category_ids=category_ids)
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    apply_pragmas(connection)
@@ -0,0 +1,32 @@
+import re
+
+from django.conf import settings
+
+PRAGMA_NAME = re.compile(r'^\w+$')
+
+
+def apply_pragmas(connection, pragmas=None):
+    '''Выполняет PRAGMA из BLOG_SQLITE_PRAGMAS на новом соединении.
+
+    WAL пускает читателей параллельно с писателем, busy_timeout
+    заставляет ждать блокировку вместо ошибки «database is locked»,
+    а synchronous=NORMAL в режиме WAL не теряет целостность базы.
+    '''
+    if connection.vendor != 'sqlite':
+        return
+    if pragmas is None:
+        pragmas = settings.BLOG_SQLITE_PRAGMAS
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            if not PRAGMA_NAME.match(name) or not PRAGMA_NAME.match(
+                str(value).lstrip('-')
+            ):
+                raise ValueError(f'Некорректная PRAGMA: {name} = {value}')
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def pragma(connection, name):
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        row = cursor.fetchone()
+    return row and row[0]
@@ -0,0 +1,73 @@
+import hashlib
+import os
+import posixpath
+import re
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+HASH_CHUNK = 64 * 1024
+HASHED_NAME = re.compile(
+    r'(^|/)[0-9a-f]{2}/[0-9a-f]{2}/(variants/)?[0-9a-f]{64}[^/]*$'
+)
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    '''Хранилище, где имя файла — SHA-256 его содержимого.
+
+    Файлы раскладываются по двум уровням подкаталогов из первых
+    символов хеша (posts_images/ab/cd/abcd….jpg), чтобы в одном каталоге
+    не скапливались миллионы записей. Одинаковые загрузки сохраняются
+    один раз. Файлы без ссылок удаляет команда collect_images, но только
+    не менявшиеся дольше грейс-периода: повторная загрузка обновляет
+    время изменения файла, и публикация успевает зафиксироваться.
+    '''
+
+    def hashed_name(self, name, content):
+        digest = hashlib.sha256()
+        content.seek(0)
+        for chunk in content.chunks(HASH_CHUNK):
+            digest.update(chunk)
+        content.seek(0)
+        checksum = digest.hexdigest()
+        extension = os.path.splitext(name)[1].lower()
+        return posixpath.join(
+            posixpath.dirname(name), checksum[:2], checksum[2:4],
+            checksum + extension,
+        )
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.hashed_name(name, content)
+        if self.exists(name):
+            self.touch(name)
+            return name
+        return self._save(name, content)
+
+    def touch(self, name):
+        '''Обновляет время изменения файла, если он ещё существует.'''
+        try:
+            os.utime(self.path(name))
+        except FileNotFoundError:
+            pass
+
+    def walk(self, path=''):
+        '''Имена всех файлов под path, рекурсивно.'''
+        directories, files = self.listdir(path)
+        for name in files:
+            yield posixpath.join(path, name)
+        for directory in directories:
+            yield from self.walk(posixpath.join(path, directory))
+
+
+def is_immutable(name):
+    '''Содержимое по такому имени никогда не меняется.'''
+    return bool(HASHED_NAME.search(name))
+
+
+post_image_storage = ContentAddressedStorage()
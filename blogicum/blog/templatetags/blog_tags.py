@@ -0,0 +1,48 @@
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from blog.cache import post_card_key, post_card_stats
+from blog.constaints import IMAGE_SIZES
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_card(post):
+    '''Карточка публикации из кэша фрагментов.'''
+    key = post_card_key(post)
+    html = cache.get(key)
+    if html is None:
+        post_card_stats['misses'] += 1
+        html = render_to_string('includes/post_card.html', {'post': post})
+        cache.set(key, html, settings.BLOG_POST_CARD_TIMEOUT)
+    else:
+        post_card_stats['hits'] += 1
+    return mark_safe(html)
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(post, variant):
+    '''Изображение публикации с srcset из сохранённых уменьшенных копий.'''
+    storage = post.image.storage
+    variants = post.image_variants
+    chosen = (
+        variants.get(variant) or variants.get('original')
+        or {'name': post.image.name}
+    )
+    sized = sorted(
+        (data for data in variants.values() if 'width' in data),
+        key=lambda data: data['width'],
+    )
+    return {
+        'src': storage.url(chosen['name']),
+        'width': chosen.get('width'),
+        'height': chosen.get('height'),
+        'srcset': ', '.join(
+            f"{storage.url(data['name'])} {data['width']}w" for data in sized
+        ) if len(sized) > 1 else '',
+        'sizes': IMAGE_SIZES,
+    }
@@ -0,0 +1,184 @@
+import shutil
+from io import BytesIO
+from tempfile import TemporaryFile
+
+from django import forms
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import (
+    FileUploadHandler, TemporaryFileUploadHandler
+)
+from django.template.defaultfilters import filesizeformat
+from PIL import Image
+
+EXIF_ORIENTATION = 0x0112
+JPEG_SOI = b'\xff\xd8'
+JPEG_STANDALONE = {0x01, *range(0xD0, 0xD8)}
+JPEG_SOS, JPEG_EOI = 0xDA, 0xD9
+JPEG_METADATA = {0xE1, 0xED, 0xFE}
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+PNG_METADATA = {b'eXIf', b'tEXt', b'zTXt', b'iTXt', b'tIME'}
+COPY_CHUNK = 64 * 1024
+
+
+class RejectedUpload(UploadedFile):
+    '''Заглушка вместо файла, превысившего BLOG_MAX_UPLOAD_SIZE.'''
+
+    rejected = True
+
+    def __init__(self, name, content_type, size):
+        super().__init__(BytesIO(), name, content_type, size)
+
+
+class LimitedUploadHandler(TemporaryFileUploadHandler):
+    '''Пишет загрузку на диск кусками и бросает её сверх лимита.
+
+    Если уже по заголовку Content-Length запрос больше лимита, файл
+    не создаётся вовсе: данные вычитываются из потока и отбрасываются.
+    '''
+
+    def handle_raw_input(self, input_data, META, content_length, boundary,
+                         encoding=None):
+        self.oversized_request = content_length > (
+            settings.BLOG_MAX_UPLOAD_SIZE + settings.BLOG_UPLOAD_FORM_OVERHEAD
+        )
+
+    def new_file(self, *args, **kwargs):
+        FileUploadHandler.new_file(self, *args, **kwargs)
+        self.received = 0
+        self.rejected = self.oversized_request or (
+            (self.content_length or 0) > settings.BLOG_MAX_UPLOAD_SIZE
+        )
+        if not self.rejected:
+            super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if not self.rejected and (
+            self.received > settings.BLOG_MAX_UPLOAD_SIZE
+        ):
+            self.rejected = True
+            self.file.close()
+        if self.rejected:
+            return None
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        if self.rejected:
+            return RejectedUpload(
+                self.file_name, self.content_type, self.received
+            )
+        return super().file_complete(file_size)
+
+
+def copy_bytes(source, target, size):
+    while size > 0:
+        chunk = source.read(min(size, COPY_CHUNK))
+        if not chunk:
+            raise ValueError('Файл обрывается')
+        target.write(chunk)
+        size -= len(chunk)
+
+
+def copy_jpeg_without_metadata(source, target, orientation=None):
+    '''Копирует JPEG по сегментам, пропуская EXIF, XMP, IPTC и комментарии.
+
+    Пиксели не декодируются; ориентация сохраняется в минимальном EXIF.
+    '''
+    if source.read(2) != JPEG_SOI:
+        raise ValueError('Это не JPEG')
+    target.write(JPEG_SOI)
+    if orientation and orientation != 1:
+        exif = Image.Exif()
+        exif[EXIF_ORIENTATION] = orientation
+        data = exif.tobytes()
+        target.write(b'\xff\xe1' + (len(data) + 2).to_bytes(2, 'big') + data)
+    while True:
+        marker = source.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            raise ValueError('Повреждённый JPEG')
+        code = marker[1]
+        while code == 0xFF:
+            code = source.read(1)[0]
+            marker = bytes((0xFF, code))
+        if code in (JPEG_SOS, JPEG_EOI):
+            target.write(marker)
+            shutil.copyfileobj(source, target, COPY_CHUNK)
+            return
+        if code in JPEG_STANDALONE:
+            target.write(marker)
+            continue
+        length = source.read(2)
+        size = int.from_bytes(length, 'big') - 2
+        if code in JPEG_METADATA:
+            source.seek(size, 1)
+            continue
+        target.write(marker + length)
+        copy_bytes(source, target, size)
+
+
+def copy_png_without_metadata(source, target):
+    '''Копирует PNG по чанкам, пропуская текстовые и EXIF-чанки.'''
+    if source.read(8) != PNG_SIGNATURE:
+        raise ValueError('Это не PNG')
+    target.write(PNG_SIGNATURE)
+    while True:
+        header = source.read(8)
+        if not header:
+            return
+        if len(header) < 8:
+            raise ValueError('Повреждённый PNG')
+        size = int.from_bytes(header[:4], 'big') + 4
+        if header[4:] in PNG_METADATA:
+            source.seek(size, 1)
+            continue
+        target.write(header)
+        copy_bytes(source, target, size)
+
+
+def strip_metadata(upload, image):
+    '''Новая загрузка без метаданных; исходная возвращается для GIF и др.'''
+    if image.format == 'JPEG':
+        orientation = image.getexif().get(EXIF_ORIENTATION)
+        copy = copy_jpeg_without_metadata
+        args = (orientation,)
+    elif image.format == 'PNG':
+        copy = copy_png_without_metadata
+        args = ()
+    else:
+        return upload
+    stripped = UploadedFile(
+        TemporaryFile(dir=settings.FILE_UPLOAD_TEMP_DIR), upload.name,
+        upload.content_type, 0, upload.charset, upload.content_type_extra,
+    )
+    upload.seek(0)
+    copy(upload, stripped, *args)
+    stripped.size = stripped.tell()
+    stripped.seek(0)
+    stripped.image = image
+    return stripped
+
+
+class UploadImageField(forms.ImageField):
+    default_error_messages = {
+        'too_large': 'Файл слишком большой: допустимо не больше %(limit)s.',
+    }
+
+    def to_python(self, data):
+        if getattr(data, 'rejected', False):
+            raise forms.ValidationError(
+                self.error_messages['too_large'],
+                code='too_large',
+                params={
+                    'limit': filesizeformat(settings.BLOG_MAX_UPLOAD_SIZE)
+                },
+            )
+        upload = super().to_python(data)
+        if upload is None or not settings.BLOG_STRIP_IMAGE_METADATA:
+            return upload
+        try:
+            return strip_metadata(upload, upload.image)
+        except (IndexError, ValueError):
+            raise forms.ValidationError(
+                self.error_messages['invalid_image'], code='invalid_image'
+            )
@@ -1,6 +1,7 @@
 from django.urls import path
+from django.utils.feedgenerator import Atom1Feed
 
-from . import views
+from . import feeds, views
 
 app_name = 'blog'
 
@@ -11,6 +12,8 @@ urlpatterns = [
          name='edit_post'),
     path('posts/<int:pk>/comment/', views.CommentCreateView.as_view(),
          name='add_comment'),
+    path('posts/<int:pk>/comments/', views.CommentListView.as_view(),
+         name='comments'),
     path('posts/<int:pk>/edit_comment/<int:comment_id>/',
          views.CommentUpdateView.as_view(), name='edit_comment'),
     path('posts/<int:pk>/delete_comment/<int:id>/',
@@ -21,11 +24,24 @@ urlpatterns = [
          name='create_post'),
     path('category/<slug:category_slug>/',
          views.CategoryListView.as_view(), name='category_posts'),
+    path('category/<slug:category_slug>/rss/', feeds.CategoryFeed(),
+         name='category_rss'),
+    path('category/<slug:category_slug>/atom/',
+         feeds.CategoryFeed(Atom1Feed), name='category_atom'),
     path('edit_profile/', views.ProfileUpdateView.as_view(),
          name='edit_profile'),
     path(
         'profile/<str:slug>/',
         views.ProfileListView.as_view(), name='profile'
     ),
+    path('profile/<str:slug>/rss/', feeds.ProfileFeed(),
+         name='profile_rss'),
+    path('profile/<str:slug>/atom/', feeds.ProfileFeed(Atom1Feed),
+         name='profile_atom'),
+    path('search/', views.SearchListView.as_view(), name='search'),
+    path('metrics/', views.metrics, name='metrics'),
+    path('export/<str:kind>/', views.export, name='export'),
+    path('rss/', feeds.IndexFeed(), name='index_rss'),
+    path('atom/', feeds.IndexFeed(Atom1Feed), name='index_atom'),
     path('', views.IndexListView.as_view(), name='index'),
 ]
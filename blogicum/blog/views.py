@@ -1,21 +1,40 @@
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Count
-from django.http import Http404
+from django.db import transaction
+from django.http import (
+    Http404, HttpResponse, HttpResponseBadRequest, StreamingHttpResponse
+)
 from django.shortcuts import get_object_or_404, reverse
+from django.utils.http import urlencode
 from django.urls import reverse_lazy
 from django.utils import timezone
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.text import compress_sequence
+from django.views.static import serve
 from django.views.generic import (
-    CreateView, DeleteView, DetailView, ListView, UpdateView
+    CreateView, DeleteView, DetailView, ListView, TemplateView, UpdateView
 )
 from blog.constaints import NUMBER_OF_POSTS
+from blog.export import EXPORTS, FORMATS, export_lines, parse_since
 from blog.forms import CommentForm, PostForm, ProfileForm
+from blog.metrics import registry
 from blog.models import Category, Comment, Post, User
 from blog.mixins import (
-    DispatchCommentMixin, GetProfileMixin, PostMixin, UrlCommentsMixin
+    AnonymousPageCacheMixin, ConditionalGetMixin, DispatchCommentMixin,
+    FeedPaginationMixin, GetProfileMixin, PostCommentsMixin, PostMixin,
+    UrlCommentsMixin, page_validator, post_validator
 )
+from blog.moderation import deleting_posts
+from blog.search import search_posts
+from blog.storage import is_immutable
+from blogicum.staticfiles import parse_accept_encoding
 
 
-class IndexListView(ListView):
+class IndexListView(
+    FeedPaginationMixin, AnonymousPageCacheMixin, ConditionalGetMixin,
+    ListView
+):
     '''Главная страница.'''
 
     model = Post
@@ -30,11 +49,26 @@ class IndexListView(ListView):
             pub_date__lte=timezone.now(),
             is_published=True,
             category__is_published=True,
-        ).order_by('-pub_date').annotate(comment_count=Count('comments'))
+        ).order_by('-pub_date')
         return queryset
 
+    def get_feed_key(self):
+        return ('index',)
 
-class PostDetailView(DetailView):
+    def get_validators(self, context):
+        page = context['page_obj']
+        return [page_validator(page), *map(post_validator, page)]
+
+    def get_scheduled_posts(self):
+        return Post.objects.filter(
+            is_published=True, category__is_published=True
+        )
+
+
+class PostDetailView(
+    PostCommentsMixin, AnonymousPageCacheMixin, ConditionalGetMixin,
+    DetailView
+):
     '''Страница отдельного поста.'''
 
     model = Post
@@ -43,22 +77,43 @@ class PostDetailView(DetailView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = self.object.comments.select_related('author')
+        context['comments'] = self.get_comments_page(self.object)
         return context
 
     def get_object(self):
-        post = get_object_or_404(Post, pk=self.kwargs['pk'])
-        if post.author == self.request.user:
-            return post
-        if not (post.is_published & post.category.is_published):
-            raise Http404('''Страница поста снятого'с публикации
-                           доступна только автору''')
-        if post.pub_date > timezone.now():
-            raise Http404('Страница отложенного поста доступна только автору')
-        return post
-
-
-class CategoryListView(ListView):
+        return self.get_visible_post()
+
+    def get_validators(self, context):
+        comments = context['comments']
+        return [
+            post_validator(self.object), page_validator(comments),
+            *(
+                (comment.pk, comment.updated_at, comment.author.username)
+                for comment in comments
+            ),
+        ]
+
+
+class CommentListView(PostCommentsMixin, TemplateView):
+    '''Следующая страница комментариев к посту (HTML-фрагмент).'''
+
+    template_name = 'includes/comment_list.html'
+
+    def get_context_data(self, **kwargs):
+        post = self.get_visible_post()
+        return dict(
+            super().get_context_data(**kwargs),
+            post=post,
+            comments=self.get_comments_page(
+                post, self.request.GET.get(self.comments_cursor_kwarg)
+            ),
+        )
+
+
+class CategoryListView(
+    FeedPaginationMixin, AnonymousPageCacheMixin, ConditionalGetMixin,
+    ListView
+):
     '''Страница категории.'''
 
     model = Post
@@ -73,8 +128,20 @@ class CategoryListView(ListView):
         return self.category.posts.select_related(
             'author', 'location', 'category',
         ).filter(is_published=True, pub_date__lte=timezone.now()
-                 ).annotate(comment_count=Count('comments')
-                            ).order_by('-pub_date')
+                 ).order_by('-pub_date')
+
+    def get_feed_key(self):
+        return ('category', self.category.pk)
+
+    def get_validators(self, context):
+        page = context['page_obj']
+        return [
+            (self.category.pk, self.category.updated_at),
+            page_validator(page), *map(post_validator, page),
+        ]
+
+    def get_scheduled_posts(self):
+        return self.category.posts.filter(is_published=True)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -82,7 +149,40 @@ class CategoryListView(ListView):
         return context
 
 
-class ProfileListView(GetProfileMixin, ListView):
+class SearchListView(ListView):
+    '''Поиск по заголовкам и текстам публикаций.'''
+
+    model = Post
+    template_name = 'blog/search.html'
+    paginate_by = NUMBER_OF_POSTS
+    query_kwarg = 'q'
+
+    def get_query(self):
+        return self.request.GET.get(self.query_kwarg, '').strip()
+
+    def get_queryset(self):
+        queryset = Post.objects.select_related(
+            'location', 'author', 'category'
+        ).filter(
+            pub_date__lte=timezone.now(),
+            is_published=True,
+            category__is_published=True,
+        )
+        return search_posts(
+            queryset, self.get_query()
+        )[:settings.BLOG_SEARCH_RESULT_LIMIT]
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.get_query()
+        context['query'] = query
+        context['query_string'] = urlencode({self.query_kwarg: query}) + '&'
+        return context
+
+
+class ProfileListView(
+    GetProfileMixin, FeedPaginationMixin, ConditionalGetMixin, ListView
+):
     '''Страница профиля пользователя.'''
 
     model = User
@@ -91,20 +191,45 @@ class ProfileListView(GetProfileMixin, ListView):
     paginate_by = NUMBER_OF_POSTS
 
     def get_object(self):
-        return get_object_or_404(User,
-                                 username=self.kwargs['slug'])
+        if not hasattr(self, 'profile'):
+            self.profile = get_object_or_404(
+                User, username=self.kwargs['slug']
+            )
+        return self.profile
 
     def get_queryset(self):
         user = self.get_object()
+        queryset = user.posts.select_related('author', 'location', 'category')
         if user == self.request.user:
-            queryset = user.posts.all().order_by('-pub_date')
+            queryset = queryset.order_by('-pub_date')
         else:
-            queryset = user.posts.filter(
+            queryset = queryset.filter(
                 pub_date__lte=timezone.now()
             ).order_by('-pub_date')
-        queryset = queryset.annotate(comment_count=Count('comments'))
         return queryset
 
+    def get_feed_key(self):
+        user = self.get_object()
+        return (
+            'profile', user.pk,
+            'all' if user == self.request.user else 'published',
+        )
+
+    def get_scheduled_posts(self):
+        user = self.get_object()
+        if user == self.request.user:
+            return Post.objects.none()
+        return user.posts.all()
+
+    def get_validators(self, context):
+        user = self.get_object()
+        page = context['page_obj']
+        return [
+            (user.pk, user.username, user.get_full_name(), user.is_staff,
+             user.date_joined),
+            page_validator(page), *map(post_validator, page),
+        ]
+
 
 class ProfileUpdateView(LoginRequiredMixin, UpdateView):
     '''Страница редактирования страницы профиля пользователя.'''
@@ -162,6 +287,10 @@ class PostDeleteView(
     template_name = 'blog/create.html'
     success_url = reverse_lazy('blog:index')
 
+    def delete(self, request, *args, **kwargs):
+        with deleting_posts([self.get_object().pk]):
+            return super().delete(request, *args, **kwargs)
+
 
 class CommentCreateView(LoginRequiredMixin, CreateView):
     '''Страница написания комментария.'''
@@ -175,6 +304,7 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
             'blog:post_detail',
             args=[self.kwargs['pk']])
 
+    @transaction.atomic
     def form_valid(self, form):
         form.instance.author = self.request.user
         form.instance.post = get_object_or_404(Post, pk=self.kwargs['pk'])
@@ -200,3 +330,54 @@ class CommentDeleteView(
     model = Comment
     template_name = 'blog/comment.html'
     pk_url_kwarg = 'id'
+
+
+def metrics(request):
+    '''Гистограммы запросов и счётчики кэша в текстовом формате Prometheus.'''
+    if request.META.get('REMOTE_ADDR') not in settings.INTERNAL_IPS:
+        raise Http404
+    return HttpResponse(
+        registry.render(), content_type='text/plain; version=0.0.4'
+    )
+
+
+@staff_member_required
+def export(request, kind):
+    '''Потоковая выгрузка публикаций или комментариев для аналитики.'''
+    if kind not in EXPORTS:
+        raise Http404
+    format = request.GET.get('format', 'ndjson')
+    if format not in FORMATS:
+        return HttpResponseBadRequest('Неизвестный формат выгрузки.')
+    try:
+        since = parse_since(request.GET.get('since'))
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+    content_type, extension = FORMATS[format]
+    content = export_lines(kind, format, since)
+    gzip = 'gzip' in parse_accept_encoding(
+        request.META.get('HTTP_ACCEPT_ENCODING', '')
+    )
+    response = StreamingHttpResponse(
+        compress_sequence(content) if gzip else content,
+        content_type=content_type,
+    )
+    if gzip:
+        response['Content-Encoding'] = 'gzip'
+    patch_vary_headers(response, ('Accept-Encoding',))
+    patch_cache_control(response, private=True, no_store=True)
+    response['Content-Disposition'] = (
+        f'attachment; filename="{kind}.{extension}"'
+    )
+    return response
+
+
+def serve_media(request, path, document_root=None):
+    '''Раздача медиа в режиме отладки; файлы по хешу кэшируются навсегда.'''
+    response = serve(request, path, document_root=document_root)
+    if is_immutable(path):
+        patch_cache_control(
+            response, public=True, immutable=True,
+            max_age=settings.BLOG_IMMUTABLE_MAX_AGE,
+        )
+    return response
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -24,6 +25,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'blog.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -58,11 +60,21 @@ WSGI_APPLICATION = 'blogicum.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'blogicum.sqlite',
         'NAME': BASE_DIR / 'db.sqlite3',
     }
 }
 
+BLOG_SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'busy_timeout': 5000,
+    'synchronous': 'normal',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+}
+
+BLOG_SQLITE_IMMEDIATE_TRANSACTIONS = True
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -93,6 +105,14 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
+STATIC_ROOT = BASE_DIR / 'collected_static'
+
+STATICFILES_STORAGE = (
+    'blogicum.staticfiles.CompressedManifestStaticFilesStorage'
+)
+
+BLOG_SERVE_STATIC = True
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 STATICFILES_DIRS = [
@@ -113,6 +133,60 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 MEDIA_URL = '/media/'
 
+FILE_UPLOAD_HANDLERS = [
+    'blog.uploads.LimitedUploadHandler',
+]
+
+BLOG_MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+
+BLOG_UPLOAD_FORM_OVERHEAD = 64 * 1024
+
+BLOG_STRIP_IMAGE_METADATA = True
+
+BLOG_IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+
 LOGIN_REDIRECT_URL = 'blog:index'
 
 LOGIN_URL = 'login'
+
+# Кэш общий для всех процессов: сброс страниц и лент из сигналов и
+# management-команд должен быть виден каждому воркеру сервера.
+# FileBasedCache при каждом set перечисляет файлы каталога, чтобы решить,
+# не пора ли их отбраковывать, а холодная страница ленты делает около
+# дюжины set. Под нагрузкой задайте BLOG_MEMCACHED — адрес Memcached.
+if os.environ.get('BLOG_MEMCACHED'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': os.environ['BLOG_MEMCACHED'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('BLOG_CACHE_DIR', BASE_DIR / 'cache'),
+            'OPTIONS': {
+                'MAX_ENTRIES': 10000,
+            },
+        }
+    }
+
+BLOG_KEYSET_PAGINATION = False
+
+BLOG_FEED_COUNT_TIMEOUT = 60 * 5
+
+BLOG_POST_CARD_TIMEOUT = 60 * 60 * 24
+
+BLOG_PAGE_CACHE_TIMEOUT = 60 * 10
+
+BLOG_SYNDICATION_TIMEOUT = 60 * 60
+
+BLOG_SEARCH_RESULT_LIMIT = 1000
+
+BLOG_ADMIN_COUNT_LIMIT = 10000
+
+BLOG_REQUEST_METRICS = True
+
+# Общий каталог для метрик нескольких воркеров (см. blog.metrics).
+BLOG_METRICS_DIR = os.environ.get('BLOG_METRICS_DIR')
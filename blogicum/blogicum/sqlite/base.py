@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    '''SQLite, где transaction.atomic открывает BEGIN IMMEDIATE.
+
+    Обычный BEGIN берёт блокировку на запись только на первом INSERT
+    или UPDATE. Если к этому моменту другой писатель уже зафиксировал
+    изменения, SQLite в режиме WAL сразу отвечает «database is
+    locked», не дожидаясь busy_timeout. BEGIN IMMEDIATE берёт
+    блокировку в начале транзакции, и писатели ждут друг друга в
+    очереди. Управляется настройкой BLOG_SQLITE_IMMEDIATE_TRANSACTIONS.
+    '''
+
+    def _start_transaction_under_autocommit(self):
+        if settings.BLOG_SQLITE_IMMEDIATE_TRANSACTIONS:
+            self.cursor().execute('BEGIN IMMEDIATE')
+        else:
+            super()._start_transaction_under_autocommit()
@@ -0,0 +1,190 @@
+import gzip
+import mimetypes
+import os
+from email.utils import formatdate
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+from django.utils.http import parse_etags
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = {
+    '.css', '.js', '.map', '.svg', '.ico', '.txt', '.html', '.json', '.xml',
+}
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+MIN_SAVING = 0.95
+CHUNK = 64 * 1024
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    '''Статика с хешем в имени и готовыми .gz/.br рядом с файлами.
+
+    Сжатые копии создаются при collectstatic один раз, а не на каждый
+    запрос; .br — только если установлен пакет brotli. Копия не
+    сохраняется, если почти не уменьшает файл. Пока collectstatic
+    не запускался, шаблоны ссылаются на файлы без хеша.
+    '''
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        names = set(paths) | set(self.hashed_files.values())
+        for name in sorted(names):
+            if Path(name).suffix.lower() not in COMPRESSIBLE:
+                continue
+            for encoding, extension in ENCODINGS:
+                if encoding == 'br' and brotli is None:
+                    continue
+                self.save_compressed(name, encoding, extension)
+
+    def save_compressed(self, name, encoding, extension):
+        with self.open(name) as original:
+            data = original.read()
+        compressed = compress(data, encoding)
+        target = name + extension
+        if self.exists(target):
+            self.delete(target)
+        if len(compressed) < len(data) * MIN_SAVING:
+            self._save(target, ContentFile(compressed))
+
+
+def parse_accept_encoding(header):
+    '''Кодировки из Accept-Encoding с ненулевым весом.'''
+    accepted = set()
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding and quality > 0:
+            accepted.add(coding.lower())
+    return accepted
+
+
+class StaticFile:
+    def __init__(self, path, immutable):
+        self.path = path
+        self.immutable = immutable
+        self.content_type = (
+            mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        )
+        self.variants = {}
+        for encoding, extension in (*ENCODINGS, (None, '')):
+            try:
+                stat = os.stat(path + extension)
+            except FileNotFoundError:
+                continue
+            self.variants[encoding] = (path + extension, stat)
+
+    def pick(self, accept_encoding):
+        accepted = parse_accept_encoding(accept_encoding)
+        for encoding, _ in ENCODINGS:
+            if encoding in self.variants and (
+                encoding in accepted or '*' in accepted
+            ):
+                return encoding, *self.variants[encoding]
+        return None, *self.variants[None]
+
+
+class StaticFilesApplication:
+    '''WSGI-обёртка, отдающая собранную статику из STATIC_ROOT.
+
+    Список файлов читается один раз при запуске, поэтому запрос не
+    касается файловой системы, пока не нужно отдать тело. Файлы с
+    хешем в имени (из манифеста) кэшируются навсегда, остальные
+    перепроверяются через ETag.
+    '''
+
+    def __init__(self, application, root=None, prefix=None):
+        self.application = application
+        self.root = str(root or settings.STATIC_ROOT or '')
+        self.prefix = prefix or settings.STATIC_URL
+        self.files = self.scan() if self.root else {}
+
+    def scan(self):
+        hashed = set(CompressedManifestStaticFilesStorage(
+            location=self.root
+        ).hashed_files.values())
+        files = {}
+        suffixes = tuple(extension for _, extension in ENCODINGS)
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                if name.endswith(suffixes):
+                    continue
+                path = os.path.join(directory, name)
+                relative = os.path.relpath(path, self.root).replace(
+                    os.sep, '/'
+                )
+                files[self.prefix + relative] = StaticFile(
+                    path, relative in hashed
+                )
+        return files
+
+    def __call__(self, environ, start_response):
+        static_file = self.files.get(environ.get('PATH_INFO', ''))
+        if static_file is None or environ['REQUEST_METHOD'] not in (
+            'GET', 'HEAD'
+        ):
+            return self.application(environ, start_response)
+        encoding, path, stat = static_file.pick(
+            environ.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}-{encoding or "id"}"'
+        headers = [
+            ('Content-Type', static_file.content_type),
+            ('Vary', 'Accept-Encoding'),
+            ('ETag', etag),
+            ('Last-Modified', formatdate(stat.st_mtime, usegmt=True)),
+            ('Cache-Control', (
+                f'public, max-age={settings.BLOG_IMMUTABLE_MAX_AGE}, '
+                'immutable'
+            ) if static_file.immutable else 'no-cache'),
+        ]
+        if encoding:
+            headers.append(('Content-Encoding', encoding))
+        if if_none_match(environ.get('HTTP_IF_NONE_MATCH', ''), etag):
+            start_response('304 Not Modified', headers)
+            return []
+        headers.append(('Content-Length', str(stat.st_size)))
+        start_response('200 OK', headers)
+        if environ['REQUEST_METHOD'] == 'HEAD':
+            return []
+        file_wrapper = environ.get('wsgi.file_wrapper')
+        if file_wrapper:
+            return file_wrapper(open(path, 'rb'), CHUNK)
+        return read_chunks(path)
+
+
+def if_none_match(header, etag):
+    '''Совпадает ли etag с одной из меток If-None-Match (сравнение слабое).'''
+    tags = parse_etags(header)
+    return '*' in tags or etag in {tag.removeprefix('W/') for tag in tags}
+
+
+def read_chunks(path):
+    with open(path, 'rb') as body:
+        yield from iter(lambda: body.read(CHUNK), b'')
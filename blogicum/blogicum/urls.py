@@ -5,6 +5,8 @@ from django.urls import include, path, reverse_lazy
 from django.contrib.auth.forms import UserCreationForm
 from django.views.generic.edit import CreateView
 
+from blog.views import serve_media
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('pages/', include('pages.urls')),
@@ -22,7 +24,7 @@ urlpatterns = [
 ]
 
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL,
+    urlpatterns += static(settings.MEDIA_URL, view=serve_media,
                           document_root=settings.MEDIA_ROOT)
 
 handler404 = 'pages.views.handler404'
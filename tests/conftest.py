@@ -18,7 +18,9 @@ from typing import (
 
 import pytest
 from django.apps import apps
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.db.models import Model, Field
 from django.forms import BaseForm
 from django.http import HttpResponse
@@ -41,6 +43,42 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True, scope="session")
+def isolated_cache(tmp_path_factory):
+    """Кэш тестов отдельно от кэша сервера разработки в той же копии.
+
+    BLOG_CACHE_DIR передаёт каталог и дочерним процессам manage.py.
+    """
+    location = str(tmp_path_factory.mktemp("cache"))
+    environ = {
+        name: os.environ.pop(name, None)
+        for name in ("BLOG_CACHE_DIR", "BLOG_MEMCACHED")
+    }
+    os.environ["BLOG_CACHE_DIR"] = location
+    cache_settings = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": location,
+            "OPTIONS": settings.CACHES["default"].get("OPTIONS", {}),
+        }
+    }
+    try:
+        with override_settings(CACHES=cache_settings):
+            yield
+    finally:
+        for name, value in environ.items():
+            os.environ.pop(name, None)
+            if value is not None:
+                os.environ[name] = value
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -0,0 +1,171 @@
+import pytest
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Post
+
+CHANGELISTS = (
+    '/admin/blog/post/',
+    '/admin/blog/comment/',
+    '/admin/blog/category/',
+    '/admin/blog/location/',
+)
+
+
+@pytest.fixture
+def make_rows(mixer, published_category, published_location):
+    def make(count):
+        users = mixer.cycle(count).blend('auth.User')
+        for author in users:
+            post = mixer.blend(
+                'blog.Post', author=author, category=published_category,
+                location=published_location,
+            )
+            mixer.blend('blog.Comment', post=post, author=author)
+            mixer.blend('blog.Category')
+            mixer.blend('blog.Location')
+    return make
+
+
+def changelist_queries(admin_client, url):
+    with CaptureQueriesContext(connection) as context:
+        assert admin_client.get(url).status_code == 200
+    return [query['sql'] for query in context.captured_queries]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url', CHANGELISTS)
+def test_changelist_queries_do_not_grow(admin_client, make_rows, url):
+    make_rows(2)
+    few = changelist_queries(admin_client, url)
+    make_rows(6)
+    many = changelist_queries(admin_client, url)
+    assert len(many) == len(few), (
+        'Убедитесь, что число запросов списка в админке не зависит от '
+        'числа строк: связанные объекты загружаются через '
+        'list_select_related.'
+    )
+    for sql in many:
+        if 'COUNT(' in sql:
+            assert 'LIMIT' in sql, (
+                'Убедитесь, что админка не считает все записи таблицы.'
+            )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url', (
+    '/admin/blog/post/{post.pk}/change/',
+    '/admin/blog/comment/{comment.pk}/change/',
+))
+def test_change_form_has_no_select_for_large_tables(
+        admin_client, make_rows, mixer, url
+):
+    make_rows(5)
+    comment = mixer.blend('blog.Comment')
+    url = url.format(post=comment.post, comment=comment)
+    content = admin_client.get(url).content.decode('utf-8')
+    others = get_user_model().objects.exclude(
+        pk__in=(comment.author_id, comment.post.author_id)
+    )
+    for username in others.values_list('username', flat=True):
+        assert f'>{username}</option>' not in content, (
+            'Убедитесь, что пользователи выбираются через автодополнение, '
+            'а не списком всех записей.'
+        )
+
+
+def run_action(admin_client, url, action, objects):
+    with CaptureQueriesContext(connection) as context:
+        response = admin_client.post(url, {
+            'action': action,
+            '_selected_action': [obj.pk for obj in objects],
+        })
+    assert response.status_code == 302
+    return len(context.captured_queries)
+
+
+@pytest.mark.django_db
+def test_unpublish_posts_is_set_based(
+        admin_client, mixer, user, published_category
+):
+    def make_posts(count):
+        return mixer.cycle(count).blend(
+            'blog.Post', author=user, category=published_category,
+            is_published=True,
+        )
+
+    few = run_action(
+        admin_client, '/admin/blog/post/', 'unpublish', make_posts(2)
+    )
+    posts = make_posts(8)
+    many = run_action(admin_client, '/admin/blog/post/', 'unpublish', posts)
+    assert many == few, (
+        'Убедитесь, что массовое снятие с публикации выполняется '
+        'несколькими запросами, а не по одному на запись.'
+    )
+    assert not Post.objects.filter(is_published=True).exists()
+    run_action(admin_client, '/admin/blog/post/', 'publish', posts[:3])
+    assert Post.objects.filter(is_published=True).count() == 3
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('model', ('category', 'location'))
+def test_publish_categories_and_locations(admin_client, mixer, model):
+    objects = mixer.cycle(3).blend(f'blog.{model}', is_published=False)
+    run_action(admin_client, f'/admin/blog/{model}/', 'publish', objects)
+    for obj in objects:
+        obj.refresh_from_db()
+        assert obj.is_published
+
+
+@pytest.mark.django_db
+def test_delete_comments_updates_counts(admin_client, mixer, user):
+    post = mixer.blend('blog.Post', author=user)
+    comments = mixer.cycle(5).blend('blog.Comment', post=post, author=user)
+    run_action(
+        admin_client, '/admin/blog/comment/', 'delete_selected_comments',
+        comments[:3],
+    )
+    post.refresh_from_db()
+    assert post.comments.count() == 2
+    assert post.comment_count == 2, (
+        'Убедитесь, что массовое удаление комментариев обновляет их '
+        'количество у публикации.'
+    )
+
+
+@pytest.mark.django_db
+def test_rows_past_count_limit_are_reachable(
+        admin_client, mixer, user, published_category, settings, monkeypatch
+):
+    settings.BLOG_ADMIN_COUNT_LIMIT = 3
+    monkeypatch.setattr(admin.site._registry[Post], 'list_per_page', 2)
+    mixer.cycle(7).blend(
+        'blog.Post', author=user, category=published_category
+    )
+    content = admin_client.get('/admin/blog/post/').content.decode()
+    assert '3+' in content, (
+        'Убедитесь, что урезанное число записей показывается как «3+».'
+    )
+    response = admin_client.get('/admin/blog/post/?p=2')
+    assert '?p=3' in response.content.decode()
+    response = admin_client.get('/admin/blog/post/?p=4')
+    assert response.status_code == 200, (
+        'Убедитесь, что страницы за пределом подсчёта открываются.'
+    )
+    assert len(response.context['cl'].result_list) == 1
+    assert admin_client.get('/admin/blog/post/?p=5').status_code == 302
+
+
+@pytest.mark.django_db
+def test_post_search_uses_index(
+        admin_client, mixer, user, published_category
+):
+    found, other = mixer.cycle(2).blend(
+        'blog.Post', author=user, category=published_category,
+        title=(title for title in ('Редкое слово', 'Другое')),
+    )
+    response = admin_client.get('/admin/blog/post/', {'q': 'редкое'})
+    assert list(response.context['cl'].result_list) == [found]
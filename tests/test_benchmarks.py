@@ -0,0 +1,36 @@
+from blog.management.commands.benchmark_http import (
+    find_regressions, percentile
+)
+
+
+def route(p95, queries=2, errors=0):
+    return {'p95_ms': p95, 'queries_per_request': queries, 'errors': errors}
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 0.50) == 50
+    assert percentile(values, 0.99) == 99
+    assert percentile([7], 0.95) == 7
+
+
+def test_find_regressions():
+    baseline = {'routes': {
+        'blog:index': route(10),
+        'blog:post_detail': route(10),
+        'pages:about': route(10),
+    }}
+    report = {'routes': {
+        'blog:index': route(11.5),
+        'blog:post_detail': route(10, queries=3),
+        'pages:about': route(20, errors=1),
+        'blog:search': route(100),
+    }}
+    regressions = {
+        item['route']: item['metrics']
+        for item in find_regressions(report, baseline, 0.2)
+    }
+    assert regressions == {
+        'blog:post_detail': ['queries_per_request'],
+        'pages:about': ['p95_ms', 'errors'],
+    }, 'Убедитесь, что сравнение с базовым замером находит регрессии.'
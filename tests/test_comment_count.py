@@ -0,0 +1,82 @@
+import pytest
+from django.core.management import call_command
+from django.db import DatabaseError, connection, transaction
+from django.db.models.signals import pre_delete
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Comment, Post
+from blog.moderation import deleting_posts
+
+
+@pytest.mark.django_db
+def test_comment_count_follows_comments(
+        user_client, user, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.post(f'/posts/{post.id}/comment/', data={'text': 'Текст'})
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        'Убедитесь, что при создании комментария увеличивается счётчик '
+        '`comment_count` публикации.'
+    )
+
+    comment = Comment.objects.get(post=post)
+    user_client.post(f'/posts/{post.id}/delete_comment/{comment.id}/')
+    post.refresh_from_db()
+    assert post.comment_count == 0, (
+        'Убедитесь, что при удалении комментария уменьшается счётчик '
+        '`comment_count` публикации.'
+    )
+
+
+@pytest.mark.django_db
+def test_recount_comments_command(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(3).blend('blog.Comment', post=post)
+    Post.objects.filter(pk=post.pk).update(comment_count=42)
+    call_command('recount_comments', batch_size=1)
+    post.refresh_from_db()
+    assert post.comment_count == 3
+
+
+@pytest.mark.django_db
+def test_failed_post_delete_keeps_comment_counts(
+        mixer, post_with_published_location
+):
+    post = post_with_published_location
+    comments = mixer.cycle(2).blend('blog.Comment', post=post)
+
+    def fail(**kwargs):
+        raise DatabaseError('Сбой при удалении')
+
+    pre_delete.connect(fail, sender=Post, dispatch_uid='test-fail-delete')
+    try:
+        with pytest.raises(DatabaseError), transaction.atomic():
+            with deleting_posts([post.pk]):
+                post.delete()
+    finally:
+        pre_delete.disconnect(sender=Post, dispatch_uid='test-fail-delete')
+    comments[0].delete()
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        'Убедитесь, что после неудачного удаления публикации счётчик '
+        '`comment_count` по-прежнему обновляется.'
+    )
+
+
+@pytest.mark.django_db
+def test_post_delete_skips_per_comment_updates(
+        user_client, mixer, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(5).blend('blog.Comment', post=post)
+    with CaptureQueriesContext(connection) as queries:
+        user_client.post(f'/posts/{post.id}/delete/')
+    assert not Post.objects.filter(pk=post.pk).exists()
+    assert not [
+        query for query in queries.captured_queries
+        if query['sql'].startswith('UPDATE "blog_post"')
+    ], (
+        'Убедитесь, что при удалении публикации счётчик не пересчитывается '
+        'на каждый её комментарий.'
+    )
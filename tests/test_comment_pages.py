@@ -0,0 +1,44 @@
+import re
+
+import pytest
+
+from blog.constaints import NUMBER_OF_COMMENTS
+
+
+def comment_anchors(content):
+    return re.findall(r'name="comment_(\d+)"', content)
+
+
+@pytest.mark.django_db
+def test_comment_thread_is_paginated(
+        client, mixer, post_with_published_location
+):
+    post = post_with_published_location
+    comments = mixer.cycle(NUMBER_OF_COMMENTS + 5).blend(
+        'blog.Comment', post=post
+    )
+    content = client.get(f'/posts/{post.id}/').content.decode('utf-8')
+    first_page = comment_anchors(content)
+    assert first_page == [
+        str(comment.id) for comment in comments[:NUMBER_OF_COMMENTS]
+    ], (
+        'Убедитесь, что на странице публикации выводится только первая '
+        'страница комментариев, от старых к новым.'
+    )
+    more_url = re.search(
+        r'href="([^"]+)" data-more-comments', content
+    ).group(1).replace('&amp;', '&')
+
+    response = client.get(more_url)
+    assert response.status_code == 200
+    content = response.content.decode('utf-8')
+    assert comment_anchors(content) == [
+        str(comment.id) for comment in comments[NUMBER_OF_COMMENTS:]
+    ]
+    assert 'data-more-comments' not in content
+
+
+@pytest.mark.django_db
+def test_comment_fragment_hidden_post(client, mixer, user):
+    post = mixer.blend('blog.Post', author=user, is_published=False)
+    assert client.get(f'/posts/{post.id}/comments/').status_code == 404
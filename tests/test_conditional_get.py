@@ -0,0 +1,100 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog.models import Post
+from blog.moderation import set_published
+
+
+@pytest.fixture
+def visible_post(mixer, user, published_category, published_location):
+    return mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        location=published_location, is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+
+
+def revalidate(client, url, response):
+    return client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url', (
+    '/',
+    '/posts/{post.pk}/',
+    '/category/{post.category.slug}/',
+    '/profile/{post.author.username}/',
+))
+def test_unchanged_page_is_not_modified(client, visible_post, url):
+    url = url.format(post=visible_post)
+    response = client.get(url)
+    assert response.status_code == 200
+    assert not response.has_header('Last-Modified')
+    for _ in range(2):
+        # Второй раз — из кэша страниц для анонимов.
+        not_modified = revalidate(client, url, response)
+        assert not_modified.status_code == 304, (
+            'Убедитесь, что неизменившаяся страница отвечает 304.'
+        )
+        assert not not_modified.templates
+        assert 'no-cache' in client.get(url)['Cache-Control'], (
+            'Убедитесь, что браузеры перепроверяют страницу при каждом '
+            'запросе.'
+        )
+
+
+@pytest.mark.django_db
+def test_changes_update_validators(client, visible_post, mixer, user):
+    url = f'/posts/{visible_post.pk}/'
+    first = client.get(url)
+    visible_post.title = 'Новый заголовок'
+    visible_post.save()
+    second = revalidate(client, url, first)
+    assert second.status_code == 200, (
+        'Убедитесь, что правка публикации меняет её ETag.'
+    )
+    mixer.blend('blog.Comment', post=visible_post, author=user)
+    third = revalidate(client, url, second)
+    assert third.status_code == 200
+    index = client.get('/')
+    visible_post.category.title = 'Другое название'
+    visible_post.category.save()
+    assert revalidate(client, '/', index).status_code == 200
+
+
+@pytest.mark.django_db
+def test_removed_post_changes_validators(
+        client, visible_post, mixer, user
+):
+    older = mixer.blend(
+        'blog.Post', author=user, category=visible_post.category,
+        is_published=True, pub_date=timezone.now() - timedelta(days=2),
+    )
+    index = client.get('/')
+    visible_post.delete()
+    response = revalidate(client, '/', index)
+    assert response.status_code == 200, (
+        'Убедитесь, что удаление публикации с ленты меняет её ETag.'
+    )
+    set_published(Post.objects.filter(pk=older.pk), False)
+    assert revalidate(client, '/', response).status_code == 200
+
+
+@pytest.mark.django_db
+def test_no_validators_for_logged_in_users(user_client, visible_post):
+    response = user_client.get(f'/posts/{visible_post.pk}/')
+    assert response.status_code == 200
+    assert not response.has_header('ETag')
+
+
+@pytest.mark.django_db
+def test_updated_at_is_maintained(visible_post):
+    assert visible_post.updated_at >= visible_post.created_at
+    before = visible_post.updated_at
+    set_published(Post.objects.filter(pk=visible_post.pk), False)
+    visible_post.refresh_from_db()
+    assert visible_post.updated_at > before, (
+        'Убедитесь, что массовые изменения обновляют updated_at.'
+    )
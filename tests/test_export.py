@@ -0,0 +1,92 @@
+import csv
+import gzip
+import io
+import json
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.export import export_rows
+from blog.models import Comment, Post
+
+
+@pytest.fixture
+def exported_posts(mixer, user, published_category, published_location):
+    posts = mixer.cycle(5).blend(
+        'blog.Post', author=user, category=published_category,
+        location=published_location,
+    )
+    for post in posts:
+        mixer.cycle(2).blend('blog.Comment', post=post, author=user)
+    return posts
+
+
+def read_ndjson(content):
+    return [json.loads(line) for line in content.decode().splitlines()]
+
+
+@pytest.mark.django_db
+def test_export_requires_staff(client, user_client, exported_posts):
+    assert client.get('/export/posts/').status_code == 302
+    assert user_client.get('/export/posts/').status_code == 302
+
+
+@pytest.mark.django_db
+def test_export_posts_ndjson(admin_client, exported_posts, user):
+    response = admin_client.get('/export/posts/')
+    assert response.status_code == 200
+    assert response.streaming, (
+        'Убедитесь, что выгрузка отдаётся через StreamingHttpResponse.'
+    )
+    rows = read_ndjson(b''.join(response.streaming_content))
+    assert [row['id'] for row in rows] == [post.pk for post in exported_posts]
+    assert rows[0]['author'] == user.username
+    assert rows[0]['category'] == exported_posts[0].category.slug
+    assert rows[0]['location'] == exported_posts[0].location.name
+
+
+@pytest.mark.django_db
+def test_export_comments_csv_gzip_since(admin_client, exported_posts):
+    Comment.objects.filter(
+        pk__in=Comment.objects.order_by('pk').values('pk')[:4]
+    ).update(created_at=timezone.now() - timedelta(days=10))
+    since = (timezone.now() - timedelta(days=1)).isoformat()
+    response = admin_client.get(
+        '/export/comments/', {'format': 'csv', 'since': since},
+        HTTP_ACCEPT_ENCODING='gzip',
+    )
+    assert response['Content-Encoding'] == 'gzip'
+    content = gzip.decompress(b''.join(response.streaming_content))
+    rows = list(csv.DictReader(io.StringIO(content.decode())))
+    assert len(rows) == 6, (
+        'Убедитесь, что параметр since отбирает записи по created_at.'
+    )
+    assert admin_client.get(
+        '/export/comments/', {'since': 'вчера'}
+    ).status_code == 400
+    assert admin_client.get('/export/users/').status_code == 404
+
+
+@pytest.mark.django_db
+def test_export_rows_use_keyset_chunks(exported_posts):
+    Post.objects.update(created_at=timezone.now())
+    with CaptureQueriesContext(connection) as context:
+        chunks = list(export_rows('posts', size=2))
+    assert [len(rows) for rows in chunks] == [2, 2, 1]
+    assert [row[0] for rows in chunks for row in rows] == sorted(
+        post.pk for post in exported_posts
+    )
+    for query in context.captured_queries:
+        assert 'OFFSET' not in query['sql']
+
+
+@pytest.mark.django_db
+def test_export_command(tmp_path, exported_posts):
+    path = tmp_path / 'posts.ndjson.gz'
+    call_command('export_data', 'posts', output=str(path), gzip=True)
+    rows = read_ndjson(gzip.decompress(path.read_bytes()))
+    assert len(rows) == 5
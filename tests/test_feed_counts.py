@@ -0,0 +1,53 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from conftest import N_PER_PAGE
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200
+    return response, [
+        query['sql'] for query in queries.captured_queries
+        if 'COUNT(' in query['sql']
+    ]
+
+
+@pytest.mark.django_db
+def test_feed_count_is_cached_and_invalidated(
+        client, mixer, user, published_category
+):
+    mixer.cycle(N_PER_PAGE + 1).blend(
+        'blog.Post', author=user, category=published_category
+    )
+    urls = (
+        '/',
+        f'/category/{published_category.slug}/',
+        f'/profile/{user.username}/',
+    )
+    for url in urls:
+        response, count_sql = count_queries(client, url)
+        assert len(count_sql) == 1
+        assert response.context['paginator'].num_pages == 2
+
+        _, count_sql = count_queries(client, url)
+        assert not count_sql, (
+            f'Убедитесь, что число записей ленты `{url}` берётся из кэша.'
+        )
+
+    mixer.cycle(N_PER_PAGE).blend(
+        'blog.Post', author=user, category=published_category
+    )
+    for url in urls:
+        response, count_sql = count_queries(client, url)
+        assert len(count_sql) == 1, (
+            f'Убедитесь, что кэш числа записей ленты `{url}` сбрасывается '
+            'при добавлении публикации.'
+        )
+        assert response.context['paginator'].num_pages == 3
+        response = client.get(f'{url}?page=3')
+        assert response.status_code == 200, (
+            f'Убедитесь, что последняя страница ленты `{url}` доступна.'
+        )
@@ -0,0 +1,113 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.feeds import PostFeed
+
+
+@pytest.fixture
+def feed_posts(mixer, user, published_category, published_location):
+    def make(count, **kwargs):
+        kwargs.setdefault('is_published', True)
+        return mixer.cycle(count).blend(
+            'blog.Post', author=user, category=published_category,
+            location=published_location,
+            pub_date=timezone.now() - timedelta(days=1), **kwargs
+        )
+    return make
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url, content_type', (
+    ('/rss/', 'application/rss+xml'),
+    ('/atom/', 'application/atom+xml'),
+))
+def test_index_feed(client, feed_posts, url, content_type):
+    visible = feed_posts(2)
+    hidden = feed_posts(1, is_published=False)
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith(content_type)
+    content = response.content.decode()
+    for post in visible:
+        assert f'/posts/{post.pk}/' in content
+    assert f'/posts/{hidden[0].pk}/' not in content, (
+        'Убедитесь, что в ленту попадают только видимые на главной '
+        'публикации.'
+    )
+    assert response['ETag']
+    assert response['Last-Modified']
+    assert 'no-cache' in response['Cache-Control'], (
+        'Убедитесь, что клиенты перепроверяют ленту при каждом запросе.'
+    )
+
+
+@pytest.mark.django_db
+def test_unchanged_feed_is_not_rendered(client, feed_posts, monkeypatch):
+    feed_posts(3)
+    response = client.get('/rss/')
+
+    def fail(*args, **kwargs):
+        raise AssertionError('Лента отрисована повторно.')
+
+    monkeypatch.setattr(PostFeed, 'get_feed', fail)
+    with CaptureQueriesContext(connection) as context:
+        not_modified = client.get(
+            '/rss/', HTTP_IF_NONE_MATCH=response['ETag']
+        )
+    assert not_modified.status_code == 304, (
+        'Убедитесь, что неизменившаяся лента отвечает 304.'
+    )
+    assert not context.captured_queries
+    assert client.get(
+        '/rss/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+    ).status_code == 304
+    assert client.get('/rss/').content == response.content
+
+
+@pytest.mark.django_db
+def test_feed_changes_with_posts(client, feed_posts):
+    etag = client.get('/rss/')['ETag']
+    post = feed_posts(1)[0]
+    response = client.get('/rss/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        'Убедитесь, что новая публикация меняет ETag ленты.'
+    )
+    assert f'/posts/{post.pk}/' in response.content.decode()
+    last_modified = response['Last-Modified']
+    post.title = 'Новый заголовок'
+    post.save()
+    response = client.get('/rss/', HTTP_IF_NONE_MATCH=response['ETag'])
+    assert 'Новый заголовок' in response.content.decode()
+    post.title = 'Ещё один заголовок'
+    post.save()
+    response = client.get('/rss/', HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == 200, (
+        'Убедитесь, что правка публикации сдвигает Last-Modified ленты.'
+    )
+    assert 'Ещё один заголовок' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_category_and_profile_feeds(
+        client, feed_posts, user, published_category, another_category
+):
+    post = feed_posts(1)[0]
+    for url in (
+        f'/category/{published_category.slug}/rss/',
+        f'/category/{published_category.slug}/atom/',
+        f'/profile/{user.username}/rss/',
+        f'/profile/{user.username}/atom/',
+    ):
+        response = client.get(url)
+        assert response.status_code == 200
+        assert f'/posts/{post.pk}/' in response.content.decode()
+    another_category.is_published = False
+    another_category.save()
+    assert client.get(
+        f'/category/{another_category.slug}/rss/'
+    ).status_code == 404
+    assert client.get('/profile/nobody/rss/').status_code == 404
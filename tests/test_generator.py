@@ -0,0 +1,64 @@
+from datetime import datetime
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import Count
+from django.utils import timezone
+
+from blog.models import Category, Comment, Location, Post
+
+ANCHOR = timezone.make_aware(datetime(2024, 6, 1, 12, 0))
+
+
+def snapshot():
+    return list(Post.objects.order_by('pk').values_list(
+        'title', 'text', 'pub_date', 'is_published', 'comment_count'
+    )), list(Comment.objects.order_by('pk').values_list(
+        'text', 'created_at'
+    ))
+
+
+def generate(seed=7):
+    call_command(
+        'generate_data', f'--anchor={ANCHOR.isoformat()}', users=5,
+        categories=3, locations=4, posts=200, comments=600, seed=seed,
+        unpublished=0.1, scheduled=0.1, batch_size=64, stdout=StringIO(),
+    )
+
+
+@pytest.mark.django_db
+def test_generate_data_is_deterministic():
+    generate()
+    first = snapshot()
+    for model in (get_user_model(), Category, Location):
+        model.objects.all().delete()
+    generate()
+    assert snapshot() == first, (
+        'Убедитесь, что одинаковые зерно и момент anchor дают одинаковые '
+        'данные.'
+    )
+    generate(seed=8)
+    assert Post.objects.count() == 400
+
+
+@pytest.mark.django_db
+def test_generated_data_is_consistent():
+    generate()
+    assert Post.objects.count() == 200
+    assert Comment.objects.count() == 600
+    posts = Post.objects.annotate(total=Count('comments'))
+    for post in posts:
+        assert post.comment_count == post.total, (
+            'Убедитесь, что генератор заполняет счётчик комментариев.'
+        )
+    assert posts.filter(pub_date__gt=ANCHOR).exists()
+    assert posts.filter(is_published=False).exists()
+    assert not posts.filter(pub_date__gt=ANCHOR, total__gt=0).exists()
+    for comment in Comment.objects.select_related('post'):
+        assert comment.post.pub_date <= comment.created_at <= ANCHOR
+    counts = sorted(posts.values_list('total', flat=True), reverse=True)
+    assert sum(counts[:20]) > sum(counts) / 3, (
+        'Убедитесь, что комментарии распределены неравномерно.'
+    )
@@ -0,0 +1,79 @@
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+
+from blog.constaints import IMAGE_VARIANT_WIDTHS
+from blog.models import Post
+
+
+@pytest.fixture
+def media_root(tmp_path, settings):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def make_jpeg(width, height):
+    buffer = BytesIO()
+    Image.new('RGB', (width, height)).save(buffer, 'JPEG')
+    return SimpleUploadedFile(
+        'photo.jpg', buffer.getvalue(), content_type='image/jpeg'
+    )
+
+
+@pytest.mark.django_db
+def test_variants_built_on_save(
+        media_root, user_client, mixer, user, published_category
+):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        image=make_jpeg(2000, 1000),
+    )
+    post.refresh_from_db()
+    variants = post.image_variants
+    assert variants['original'] == {
+        'name': post.image.name, 'width': 2000, 'height': 1000,
+    }
+    for variant, width in IMAGE_VARIANT_WIDTHS.items():
+        assert variants[variant]['width'] == width
+        assert variants[variant]['height'] == width // 2
+        assert (media_root / variants[variant]['name']).exists()
+
+    content = user_client.get('/').content.decode('utf-8')
+    assert 'srcset="' in content
+    assert f'width="{IMAGE_VARIANT_WIDTHS["card"]}"' in content
+
+
+@pytest.mark.django_db
+def test_small_image_is_not_upscaled(
+        media_root, mixer, user, published_category
+):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        image=make_jpeg(100, 100),
+    )
+    post.refresh_from_db()
+    assert list(post.image_variants) == ['original']
+
+
+@pytest.mark.django_db
+def test_backfill_command(media_root, mixer, user, published_category):
+    posts = [
+        mixer.blend(
+            'blog.Post', author=user, category=published_category,
+            image=make_jpeg(1000, 500),
+        ) for _ in range(2)
+    ]
+    Post.objects.update(image_variants={})
+    output = StringIO()
+    call_command('build_image_variants', workers=2, stdout=output)
+    assert 'изображений: 1, публикаций: 2' in output.getvalue(), (
+        'Убедитесь, что копии общего файла строятся один раз.'
+    )
+    for post in posts:
+        post.refresh_from_db()
+        assert post.image_variants['card']['width'] == (
+            IMAGE_VARIANT_WIDTHS['card']
+        )
@@ -0,0 +1,183 @@
+import json
+from io import BytesIO, StringIO
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from blog import importer
+from blog.importer import DumpError, Journal, RecordReader
+from blog.models import Category, Comment, Location, Post
+
+DUMP = Path(__file__).resolve().parent.parent / 'blogicum' / 'db.json'
+
+
+def run_import(path, **options):
+    call_command('import_data', str(path), stdout=StringIO(), **options)
+
+
+@pytest.mark.django_db
+def test_import_dump_fixture(mixer, tmp_path):
+    records = json.loads(DUMP.read_text(encoding='utf-8'))
+    authors = {
+        record['fields']['author'] for record in records
+        if record['model'] == 'blog.post'
+    }
+    for pk in authors:
+        mixer.blend('auth.User', pk=pk)
+    mixer.blend('blog.Category')
+    run_import(DUMP, journal=tmp_path / 'db.json.import')
+    assert Post.objects.count() == 39
+    assert Location.objects.count() == 12
+    assert Category.objects.count() == 7
+    source = next(
+        record for record in records if record['model'] == 'blog.post'
+    )
+    post = Post.objects.get(title=source['fields']['title'])
+    assert post.category.title == next(
+        record['fields']['title'] for record in records
+        if record['model'] == 'blog.category'
+        and record['pk'] == source['fields']['category']
+    ), 'Убедитесь, что связи переводятся на новые первичные ключи.'
+    assert post.created_at.isoformat().startswith('2022-12-18T23:06:18')
+
+
+def write_ndjson(path, records):
+    path.write_text(
+        ''.join(json.dumps(record) + '\n' for record in records),
+        encoding='utf-8',
+    )
+
+
+def ndjson_records(username, posts=10, comments_per_post=3):
+    yield {'model': 'blog.category', 'pk': 50, 'fields': {
+        'title': 'Старая', 'slug': 'old', 'description': 'Описание',
+        'is_published': True, 'created_at': '2020-01-01T00:00:00Z',
+    }}
+    for number in range(posts):
+        yield {'model': 'blog.post', 'pk': 100 + number, 'fields': {
+            'title': f'Пост {number}', 'text': 'Текст',
+            'pub_date': '2020-01-02T00:00:00Z', 'author': [username],
+            'category': 50, 'location': 999, 'is_published': True,
+            'created_at': '2020-01-02T00:00:00Z', 'comment_count': 99,
+        }}
+        for _ in range(comments_per_post):
+            yield {'model': 'blog.comment', 'pk': None, 'fields': {
+                'post': 100 + number, 'author': [username],
+                'text': 'Комментарий', 'created_at': '2020-01-03T00:00:00Z',
+            }}
+    yield {'model': 'blog.comment', 'fields': {
+        'post': 12345, 'author': [username], 'text': 'Потерянный',
+    }}
+
+
+@pytest.mark.django_db
+def test_import_ndjson_resumes_after_failure(tmp_path, user, monkeypatch):
+    path = tmp_path / 'dump.ndjson'
+    write_ndjson(path, ndjson_records(user.username))
+    write = Journal.write
+    calls = []
+
+    def failing_write(self, entry):
+        # Строка журнала записана, а транзакция порции откатывается.
+        write(self, entry)
+        calls.append(entry)
+        if len(calls) == 3:
+            raise RuntimeError('обрыв')
+
+    monkeypatch.setattr(Journal, 'write', failing_write)
+    with pytest.raises(RuntimeError):
+        run_import(path, batch_size=7)
+    monkeypatch.setattr(Journal, 'write', write)
+    assert 0 < Comment.objects.count() < 30
+    run_import(path, batch_size=7)
+    assert Post.objects.count() == 10
+    assert Comment.objects.count() == 30, (
+        'Убедитесь, что повторный запуск продолжает импорт с места '
+        'остановки и не дублирует записи.'
+    )
+    for post in Post.objects.all():
+        assert post.author == user
+        assert post.category.slug == 'old'
+        assert post.location is None
+        assert post.comment_count == 3
+    run_import(path, batch_size=7)
+    assert Post.objects.count() == 10
+
+
+@pytest.mark.django_db
+def test_import_rejects_broken_json(tmp_path):
+    path = tmp_path / 'broken.json'
+    path.write_text('[{"model": "blog.location", "fields": {', 'utf-8')
+    with pytest.raises(CommandError):
+        run_import(path)
+
+
+def test_record_reader_refills_split_records(monkeypatch):
+    monkeypatch.setattr(importer, 'READ_SIZE', 3)
+    records = [
+        {'text': 'Длинная строка \u00e9 с "кавычками"', 'value': True},
+        {'number': -12.5e3, 'empty': None, 'flag': False},
+    ]
+    stream = BytesIO(json.dumps(records, ensure_ascii=False).encode())
+    assert list(RecordReader(stream)) == records, (
+        'Убедитесь, что запись, разрезанная границей чтения посреди '
+        'строки, числа или литерала, дочитывается.'
+    )
+
+
+def test_record_reader_fails_fast_on_broken_record(monkeypatch):
+    monkeypatch.setattr(importer, 'READ_SIZE', 64)
+    stream = BytesIO(
+        b'{"a": 1}\n{"a": nope}\n' + b'{"a": 1}\n' * 10000
+    )
+    reader = iter(RecordReader(stream))
+    assert next(reader) == {'a': 1}
+    with pytest.raises(DumpError):
+        next(reader)
+    assert stream.tell() <= 128, (
+        'Убедитесь, что ошибка посреди буфера не приводит к чтению '
+        'файла до конца.'
+    )
+
+
+def test_record_reader_limits_record_size(monkeypatch):
+    monkeypatch.setattr(importer, 'READ_SIZE', 64)
+    monkeypatch.setattr(importer, 'MAX_RECORD_SIZE', 256)
+    stream = BytesIO(b'{"text": "' + b'x' * 100000 + b'"}')
+    with pytest.raises(DumpError):
+        list(RecordReader(stream))
+    assert stream.tell() <= 512
+
+
+@pytest.mark.django_db
+def test_import_matches_existing_categories_by_slug(tmp_path, user, mixer):
+    existing = mixer.blend('blog.Category', slug='old')
+    path = tmp_path / 'dump.ndjson'
+    records = list(ndjson_records(user.username, posts=2))
+    records.insert(1, {'model': 'blog.category', 'pk': 51, 'fields': {
+        'title': 'Дубль', 'slug': 'new', 'description': 'Описание',
+        'is_published': True,
+    }})
+    records.insert(2, {'model': 'blog.category', 'pk': 52, 'fields': {
+        'title': 'Ещё дубль', 'slug': 'new', 'description': 'Описание',
+        'is_published': True,
+    }})
+    records.append({'model': 'blog.post', 'pk': 200, 'fields': {
+        'title': 'Во второй', 'text': 'Текст', 'author': [user.username],
+        'pub_date': '2020-01-02T00:00:00Z', 'category': 52,
+    }})
+    write_ndjson(path, records)
+    run_import(path)
+    assert Category.objects.count() == 2, (
+        'Убедитесь, что категории с уже занятым slug не создаются заново.'
+    )
+    assert set(
+        Post.objects.values_list('category__slug', flat=True)
+    ) == {'old', 'new'}
+    assert Post.objects.filter(category=existing).count() == 2, (
+        'Убедитесь, что публикации связываются с существующей категорией '
+        'по slug.'
+    )
+    assert Post.objects.get(title='Во второй').category.slug == 'new'
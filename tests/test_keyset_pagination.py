@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from conftest import N_PER_PAGE
+
+
+@pytest.fixture
+def many_posts(mixer, user, published_category):
+    now = timezone.now()
+    return mixer.cycle(N_PER_PAGE * 2 + 5).blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True,
+        pub_date=(now - timedelta(minutes=i // 3) for i in range(100)),
+    )
+
+
+def walk_feed(client, url, cursor_attr):
+    pages = []
+    cursor = None
+    while True:
+        response = client.get(url, {'cursor': cursor} if cursor else {})
+        assert response.status_code == 200
+        page = response.context['page_obj']
+        pages.append(page)
+        cursor = getattr(page, cursor_attr)
+        if not cursor:
+            return pages
+
+
+@pytest.mark.django_db
+@override_settings(BLOG_KEYSET_PAGINATION=True)
+def test_keyset_pagination_walks_feed(client, many_posts):
+    pages = walk_feed(client, '/', 'next_cursor')
+    assert [len(page) for page in pages] == [N_PER_PAGE, N_PER_PAGE, 5]
+    seen = [post.pk for page in pages for post in page]
+    expected = sorted(
+        many_posts, key=lambda post: (post.pub_date, post.pk), reverse=True
+    )
+    assert seen == [post.pk for post in expected], (
+        'Курсорная пагинация должна выдавать каждую публикацию один раз '
+        'в порядке убывания даты публикации.'
+    )
+
+    last = pages[-1]
+    response = client.get('/', {'cursor': last.previous_cursor})
+    assert (
+        [post.pk for post in response.context['page_obj']]
+        == [post.pk for post in pages[-2]]
+    )
+
+
+@pytest.mark.django_db
+@override_settings(BLOG_KEYSET_PAGINATION=True)
+def test_keyset_pagination_skips_count(client, many_posts):
+    with CaptureQueriesContext(connection) as queries:
+        client.get('/')
+    assert not any(
+        'COUNT(*)' in query['sql'] for query in queries.captured_queries
+    ), 'Курсорная пагинация не должна считать общее число публикаций.'
+
+
+@pytest.mark.django_db
+@override_settings(BLOG_KEYSET_PAGINATION=True)
+def test_keyset_pagination_rejects_bad_cursor(client):
+    assert client.get('/', {'cursor': 'garbage'}).status_code == 404
@@ -0,0 +1,104 @@
+import os
+import re
+import time
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import RequestFactory
+from PIL import Image
+
+from blog.storage import post_image_storage
+from blog.views import serve_media
+
+
+@pytest.fixture
+def media_root(tmp_path, settings):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def make_jpeg(name='photo.jpg'):
+    buffer = BytesIO()
+    Image.new('RGB', (1000, 500), 'red').save(buffer, 'JPEG')
+    return SimpleUploadedFile(
+        name, buffer.getvalue(), content_type='image/jpeg'
+    )
+
+
+@pytest.mark.django_db
+def test_identical_uploads_are_stored_once(
+        media_root, mixer, user, published_category
+):
+    first, second = (
+        mixer.blend(
+            'blog.Post', author=user, category=published_category,
+            image=make_jpeg(name),
+        ) for name in ('first.JPG', 'second.jpg')
+    )
+    assert re.fullmatch(
+        r'posts_images/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.jpg',
+        first.image.name,
+    ), 'Убедитесь, что файлы именуются по хешу содержимого.'
+    assert first.image.name == second.image.name, (
+        'Убедитесь, что одинаковые загрузки сохраняются одним файлом.'
+    )
+    assert second.image_variants == first.image_variants
+    assert len(list(media_root.rglob('*.jpg'))) == len(first.image_variants)
+    path = media_root / first.image.name
+
+    first.delete()
+    call_command('collect_images', grace=0)
+    assert path.exists(), (
+        'Убедитесь, что файл не удаляется, пока на него ссылаются.'
+    )
+    second.delete()
+    call_command('collect_images')
+    assert path.exists(), (
+        'Убедитесь, что недавно загруженные файлы переживают грейс-период.'
+    )
+    call_command('collect_images', grace=0)
+    assert not list(media_root.rglob('*.jpg')), (
+        'Убедитесь, что файл и его копии удаляются, когда на них не '
+        'осталось ссылок.'
+    )
+
+
+@pytest.mark.django_db
+def test_reupload_survives_collection(
+        media_root, mixer, user, published_category
+):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        image=make_jpeg(),
+    )
+    path = media_root / post.image.name
+    old = time.time() - 24 * 60 * 60
+    for file in media_root.rglob('*.jpg'):
+        os.utime(file, (old, old))
+    post.delete()
+    # Та же фотография загружается снова, а публикация ещё не сохранена.
+    assert post_image_storage.save(
+        'posts_images/again.jpg', make_jpeg()
+    ) == post.image.name
+    call_command('collect_images')
+    assert path.exists(), (
+        'Убедитесь, что повторная загрузка защищает файл от удаления.'
+    )
+
+
+@pytest.mark.django_db
+def test_hashed_media_is_immutable(
+        media_root, mixer, user, published_category
+):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        image=make_jpeg(),
+    )
+    (media_root / 'legacy.jpg').write_bytes(b'legacy')
+    request = RequestFactory().get('/')
+    response = serve_media(request, post.image.name, media_root)
+    assert 'immutable' in response['Cache-Control']
+    response = serve_media(request, 'legacy.jpg', media_root)
+    assert not response.has_header('Cache-Control')
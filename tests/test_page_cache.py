@@ -0,0 +1,73 @@
+import pytest
+from django.core.checks import run_checks
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+
+
+def get_with_queries(client, url, **params):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, params)
+    assert response.status_code == 200
+    return response.content.decode('utf-8'), len(queries)
+
+
+@pytest.mark.django_db
+def test_anonymous_pages_are_cached_and_purged(
+        client, mixer, post_with_published_location
+):
+    post = post_with_published_location
+    urls = (
+        '/',
+        f'/category/{post.category.slug}/',
+        f'/posts/{post.id}/',
+    )
+    for url in urls:
+        get_with_queries(client, url)
+        _, queries = get_with_queries(client, url)
+        assert queries == 0, (
+            f'Убедитесь, что страница `{url}` для анонимного пользователя '
+            'отдаётся из кэша.'
+        )
+        _, queries = get_with_queries(client, url, page=1)
+        assert queries, 'Номер страницы должен входить в ключ кэша.'
+
+    comment = mixer.blend('blog.Comment', post=post)
+    for url in urls:
+        _, queries = get_with_queries(client, url)
+        assert queries, (
+            f'Убедитесь, что кэш страницы `{url}` сбрасывается при '
+            'добавлении комментария.'
+        )
+    content, _ = get_with_queries(client, f'/posts/{post.id}/')
+    assert f'comment_{comment.id}' in content
+
+    post.location.name = 'Новое место'
+    post.location.save()
+    for url in urls:
+        content, _ = get_with_queries(client, url)
+        assert 'Новое место' in content
+
+
+@pytest.mark.django_db
+def test_authenticated_pages_are_not_cached(
+        user_client, post_with_published_location
+):
+    get_with_queries(user_client, '/')
+    _, queries = get_with_queries(user_client, '/')
+    assert queries
+
+
+def test_cache_is_shared_between_processes():
+    assert not [
+        message for message in run_checks() if message.id.startswith('blog.')
+    ], 'Убедитесь, что в CACHES указан общий для процессов бэкенд.'
+    locmem = {'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }}
+    with override_settings(CACHES=locmem, DEBUG=False):
+        assert [
+            message.id for message in run_checks()
+            if message.id.startswith('blog.')
+        ] == ['blog.E001'], (
+            'Убедитесь, что проверка запрещает кэш в памяти процесса.'
+        )
@@ -0,0 +1,41 @@
+import pytest
+
+from blog.cache import post_card_stats
+
+
+def get_stats():
+    return post_card_stats['hits'], post_card_stats['misses']
+
+
+@pytest.mark.django_db
+def test_post_card_fragments_are_cached(
+        user_client, mixer, post_with_published_location
+):
+    post = post_with_published_location
+    hits, misses = get_stats()
+    user_client.get('/')
+    assert get_stats() == (hits, misses + 1)
+    user_client.get('/')
+    assert get_stats() == (hits + 1, misses + 1), (
+        'Убедитесь, что повторный показ карточки публикации берётся из кэша.'
+    )
+
+    mixer.blend('blog.Comment', post=post)
+    content = user_client.get('/').content.decode('utf-8')
+    assert get_stats() == (hits + 1, misses + 2), (
+        'Убедитесь, что кэш карточки сбрасывается при изменении числа '
+        'комментариев.'
+    )
+    assert 'Комментарии (1)' in content
+
+    post.category.title = 'Новое название категории'
+    post.category.save()
+    content = user_client.get('/').content.decode('utf-8')
+    assert 'Новое название категории' in content
+
+
+@pytest.mark.django_db
+def test_cache_metrics_endpoint(client):
+    response = client.get('/metrics/')
+    assert response.status_code == 200
+    assert b'blog_post_card_cache_hits_total' in response.content
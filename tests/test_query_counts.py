@@ -0,0 +1,83 @@
+import pytest
+
+SESSION_QUERIES = 2
+
+
+@pytest.fixture
+def own_post(mixer, user, published_category, published_location):
+    return mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        location=published_location,
+    )
+
+
+@pytest.fixture
+def own_comment(mixer, user, own_post):
+    return mixer.blend('blog.Comment', post=own_post, author=user)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url, queries', (
+    ('/posts/{post.id}/edit/', SESSION_QUERIES + 3),
+    ('/posts/{post.id}/delete/', SESSION_QUERIES + 1),
+    ('/posts/{post.id}/edit_comment/{comment.id}/', SESSION_QUERIES + 1),
+    ('/posts/{post.id}/delete_comment/{comment.id}/', SESSION_QUERIES + 1),
+))
+def test_edit_and_delete_pages_query_count(
+        user_client, django_assert_num_queries, own_post, own_comment,
+        url, queries
+):
+    url = url.format(post=own_post, comment=own_comment)
+    with django_assert_num_queries(queries):
+        assert user_client.get(url).status_code == 200
+
+
+@pytest.mark.django_db
+def test_delete_comment_query_count(
+        user_client, django_assert_num_queries, own_post, own_comment
+):
+    url = f'/posts/{own_post.id}/delete_comment/{own_comment.id}/'
+    with django_assert_num_queries(SESSION_QUERIES + 4):
+        user_client.post(url)
+
+
+@pytest.mark.django_db
+def test_delete_post_query_count(
+        user_client, django_assert_num_queries, mixer, own_post
+):
+    mixer.cycle(3).blend('blog.Comment', post=own_post)
+    with django_assert_num_queries(SESSION_QUERIES + 6):
+        user_client.post(f'/posts/{own_post.id}/delete/')
+
+
+@pytest.mark.django_db
+def test_profile_query_count(
+        user_client, django_assert_num_queries, mixer, user, own_post
+):
+    mixer.cycle(5).blend(
+        'blog.Post', author=user, category=own_post.category,
+        location=own_post.location,
+    )
+    user_client.get(f'/profile/{user.username}/')
+    with django_assert_num_queries(SESSION_QUERIES + 2):
+        user_client.get(f'/profile/{user.username}/')
+
+
+@pytest.mark.django_db
+def test_post_detail_query_count(
+        client, django_assert_num_queries, mixer, own_post
+):
+    mixer.cycle(3).blend('blog.Comment', post=own_post)
+    with django_assert_num_queries(2):
+        assert client.get(f'/posts/{own_post.id}/').status_code == 200
+
+
+@pytest.mark.django_db
+def test_post_detail_author_query_count(
+        user_client, django_assert_num_queries, mixer, own_post
+):
+    own_post.is_published = False
+    own_post.save()
+    mixer.cycle(3).blend('blog.Comment', post=own_post)
+    with django_assert_num_queries(SESSION_QUERIES + 2):
+        assert user_client.get(f'/posts/{own_post.id}/').status_code == 200
@@ -0,0 +1,60 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.test import RequestFactory
+
+from blog.views import CategoryListView, IndexListView, ProfileListView
+
+
+def get_feed_queryset(view_class, user=None, **kwargs):
+    request = RequestFactory().get('/')
+    request.user = user or AnonymousUser()
+    view = view_class()
+    view.setup(request, **kwargs)
+    return view.get_queryset()
+
+
+def explain_query_plan(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def assert_uses_index(plan, index_name, feed_name):
+    table_scans = [
+        step for step in plan
+        if step.startswith('SCAN blog_post') and 'USING' not in step
+    ]
+    assert not table_scans, (
+        f'Запрос ленты `{feed_name}` выполняет полный просмотр таблицы '
+        f'публикаций:\n{plan}'
+    )
+    assert any(index_name in step for step in plan), (
+        f'Запрос ленты `{feed_name}` не использует индекс `{index_name}`:'
+        f'\n{plan}'
+    )
+
+
+@pytest.mark.django_db
+def test_index_feed_uses_index():
+    plan = explain_query_plan(get_feed_queryset(IndexListView))
+    assert_uses_index(plan, 'post_published_feed_idx', 'index')
+
+
+@pytest.mark.django_db
+def test_category_feed_uses_index(published_category):
+    plan = explain_query_plan(get_feed_queryset(
+        CategoryListView, category_slug=published_category.slug
+    ))
+    assert_uses_index(plan, 'post_category_feed_idx', 'category_posts')
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('as_author', (False, True))
+def test_profile_feed_uses_index(user, as_author):
+    plan = explain_query_plan(get_feed_queryset(
+        ProfileListView, user=user if as_author else None,
+        slug=user.username,
+    ))
+    assert_uses_index(plan, 'post_author_feed_idx', 'profile')
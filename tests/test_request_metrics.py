@@ -0,0 +1,68 @@
+import json
+import os
+import re
+
+import pytest
+
+from blog.metrics import Registry, registry
+
+
+@pytest.fixture(autouse=True)
+def clear_registry():
+    registry.clear()
+
+
+@pytest.mark.django_db
+def test_server_timing_header(user_client, django_assert_num_queries):
+    with django_assert_num_queries(4) as context:
+        response = user_client.get('/')
+    header = response['Server-Timing']
+    assert re.search(r'app;dur=[\d.]+', header)
+    assert f'desc="{len(context.captured_queries)} queries"' in header, (
+        'Убедитесь, что заголовок Server-Timing сообщает число SQL-запросов.'
+    )
+    assert 'render;dur=' in header
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint_aggregates_by_url_name(client):
+    client.get('/')
+    client.get('/')
+    client.get('/no-such-page/')
+    content = client.get('/metrics/').content.decode()
+    assert (
+        'blog_request_duration_seconds_count{view="blog:index"} 2'
+        in content
+    ), 'Убедитесь, что время запросов копится по имени URL.'
+    assert 'blog_request_duration_seconds_count{view="unresolved"} 1' in (
+        content
+    )
+    assert (
+        'blog_response_size_bytes_bucket{view="blog:index",le="+Inf"} 2'
+        in content
+    )
+    assert '# TYPE blog_request_db_queries histogram' in content
+
+
+def test_metrics_endpoint_is_internal(client):
+    response = client.get('/metrics/', REMOTE_ADDR='10.0.0.1')
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint_sums_workers(client, settings, tmp_path):
+    settings.BLOG_METRICS_DIR = str(tmp_path)
+    client.get('/')
+    other = Registry()
+    other.observe('blog:index', duration=0.1, size=100)
+    other.observe('blog:index', duration=0.2, size=100)
+    (tmp_path / '1.json').write_text(json.dumps(other.dump()))
+    content = client.get('/metrics/').content.decode()
+    assert (
+        'blog_request_duration_seconds_count{view="blog:index"} 3'
+        in content
+    ), (
+        'Убедитесь, что страница метрик суммирует счётчики всех воркеров '
+        'из каталога BLOG_METRICS_DIR.'
+    )
+    assert (tmp_path / f'{os.getpid()}.json').exists()
@@ -0,0 +1,104 @@
+import subprocess
+import sys
+from datetime import timedelta
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import Post
+from blog.scheduling import cache_timeout, feed_valid_until, release_due_posts
+
+
+@pytest.mark.django_db
+def test_feed_valid_until_next_scheduled_post(
+        mixer, user, published_category
+):
+    posts = Post.objects.filter(is_published=True)
+    assert feed_valid_until(('index',), posts) is None
+
+    pub_date = timezone.now() + timedelta(minutes=5)
+    mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        pub_date=pub_date,
+    )
+    valid_until = feed_valid_until(('index',), posts)
+    assert valid_until == pub_date, (
+        'Убедитесь, что срок актуальности ленты сбрасывается при добавлении '
+        'отложенной публикации.'
+    )
+    assert cache_timeout(valid_until, 3600) <= 5 * 60
+    assert cache_timeout(None, 3600) == 3600
+
+
+@pytest.mark.django_db
+def test_release_due_posts_purges_feed(
+        client, mixer, user, published_category
+):
+    pub_date = timezone.now() + timedelta(minutes=5)
+    mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        pub_date=pub_date,
+    )
+    client.get('/')
+    with CaptureQueriesContext(connection) as queries:
+        client.get('/')
+    assert not queries
+
+    assert release_due_posts(pub_date - timedelta(seconds=1), pub_date) == 1
+    with CaptureQueriesContext(connection) as queries:
+        client.get('/')
+    assert queries, (
+        'Убедитесь, что при выходе отложенной публикации кэш ленты '
+        'сбрасывается.'
+    )
+    assert release_due_posts(pub_date, pub_date + timedelta(1)) == 0
+
+
+@pytest.mark.django_db
+def test_publish_tick_releases_due_posts(
+        client, mixer, user, published_category
+):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        title='Отложенная публикация',
+        pub_date=timezone.now() + timedelta(minutes=5),
+    )
+    assert post.title not in client.get('/').content.decode()
+    # pub_date наступает без сигналов, как при обычном течении времени.
+    Post.objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(seconds=1)
+    )
+    assert post.title not in client.get('/').content.decode()
+    call_command('publish_tick', once=True)
+    assert post.title in client.get('/').content.decode(), (
+        'Убедитесь, что publish_tick сбрасывает кэш ленты, когда наступает '
+        'pub_date отложенной публикации.'
+    )
+
+
+@pytest.mark.django_db
+def test_feed_purge_reaches_other_processes(client, mixer, user):
+    client.get('/')
+    with CaptureQueriesContext(connection) as queries:
+        client.get('/')
+    assert not queries
+    # publish_tick работает в отдельном процессе и сбрасывает кэш теми же
+    # вызовами, что и release_due_posts.
+    subprocess.run(
+        [
+            sys.executable, 'manage.py', 'shell', '-c',
+            'from blog.cache import invalidate_feeds, purge_post_pages; '
+            'invalidate_feeds(); purge_post_pages()',
+        ],
+        cwd=settings.BASE_DIR, check=True,
+    )
+    with CaptureQueriesContext(connection) as queries:
+        client.get('/')
+    assert queries, (
+        'Убедитесь, что сброс кэша из другого процесса доходит до '
+        'процесса сервера.'
+    )
@@ -0,0 +1,90 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import Post
+
+
+@pytest.fixture
+def searchable_posts(mixer, user, published_category, published_location):
+    def make(title, text, **kwargs):
+        kwargs.setdefault('category', published_category)
+        return mixer.blend(
+            'blog.Post', author=user, location=published_location,
+            title=title, text=text,
+            pub_date=timezone.now() - timedelta(days=1), **kwargs
+        )
+    return make
+
+
+def found(client, query, **params):
+    response = client.get('/search/', {'q': query, **params})
+    assert response.status_code == 200
+    return [post.pk for post in response.context['page_obj']]
+
+
+@pytest.mark.django_db
+def test_search_ranks_title_matches_first(client, searchable_posts):
+    in_text = searchable_posts('Заметка', 'Про Байкал и нерпу')
+    in_title = searchable_posts('Байкал зимой', 'Лёд и ветер')
+    searchable_posts('Про другое', 'Ничего общего')
+    assert found(client, 'байкал') == [in_title.pk, in_text.pk], (
+        'Убедитесь, что поиск находит публикации по заголовку и тексту '
+        'и ставит совпадения в заголовке выше.'
+    )
+    assert found(client, 'бай') == [in_title.pk, in_text.pk]
+    assert found(client, 'байкал нерпу') == [in_text.pk]
+    assert found(client, '") OR NEAR(') == []
+    assert found(client, '') == []
+
+
+@pytest.mark.django_db
+def test_search_index_follows_saves_and_deletes(client, searchable_posts):
+    post = searchable_posts('Старый заголовок', 'Текст')
+    post.title = 'Новый заголовок'
+    post.save()
+    assert found(client, 'старый') == []
+    assert found(client, 'новый') == [post.pk]
+    post.delete()
+    assert found(client, 'новый') == []
+
+
+@pytest.mark.django_db
+def test_search_applies_feed_visibility(
+        client, searchable_posts, another_category
+):
+    visible = searchable_posts('Видимый пост', 'Текст')
+    searchable_posts('Видимый черновик', 'Текст', is_published=False)
+    scheduled = searchable_posts('Видимый отложенный', 'Текст')
+    Post.objects.filter(pk=scheduled.pk).update(
+        pub_date=timezone.now() + timedelta(days=1)
+    )
+    another_category.is_published = False
+    another_category.save()
+    searchable_posts(
+        'Видимый в скрытой категории', 'Текст', category=another_category
+    )
+    assert found(client, 'видимый') == [visible.pk], (
+        'Убедитесь, что поиск показывает только те публикации, что видны '
+        'на главной странице.'
+    )
+
+
+@pytest.mark.django_db
+def test_search_is_paginated(client, searchable_posts):
+    for number in range(12):
+        searchable_posts(f'Пост {number}', 'Общий текст')
+    assert len(found(client, 'общий')) == 10
+    assert len(found(client, 'общий', page=2)) == 2
+    content = client.get('/search/', {'q': 'общий'}).content.decode()
+    assert '?q=%D0%BE%D0%B1%D1%89%D0%B8%D0%B9&amp;page=2' in content
+
+
+@pytest.mark.django_db
+def test_rebuild_search_index(client, searchable_posts):
+    post = searchable_posts('Пропущенный', 'Текст')
+    Post.objects.filter(pk=post.pk).update(title='Обновлённый')
+    call_command('rebuild_search_index')
+    assert found(client, 'обновлённый') == [post.pk]
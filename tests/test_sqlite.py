@@ -0,0 +1,37 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from blog.management.commands.benchmark_sqlite import summary
+from blog.sqlite import apply_pragmas, pragma
+
+
+@pytest.mark.django_db
+def test_pragmas_are_applied_to_new_connections(settings):
+    assert pragma(connection, 'busy_timeout') == (
+        settings.BLOG_SQLITE_PRAGMAS['busy_timeout']
+    ), 'Убедитесь, что PRAGMA из настроек выполняются при подключении.'
+    apply_pragmas(connection, {'cache_size': -1024})
+    assert pragma(connection, 'cache_size') == -1024
+    with pytest.raises(ValueError):
+        apply_pragmas(connection, {'cache_size = 1; DROP TABLE x': 1})
+
+
+@pytest.mark.django_db(transaction=True)
+def test_sqlite_maintenance(mixer):
+    mixer.cycle(3).blend('blog.Location')
+    output = StringIO()
+    call_command('sqlite_maintenance', stdout=output)
+    content = output.getvalue()
+    for step in ('ANALYZE', 'PRAGMA optimize', 'WAL checkpoint', 'Готово'):
+        assert step in content
+
+
+def test_benchmark_summary():
+    result = summary([0.01] * 99 + [1.0], elapsed=2)
+    assert result['operations'] == 100
+    assert result['per_second'] == 50
+    assert result['p50_ms'] == 10
+    assert summary([], elapsed=1) == {'operations': 0, 'per_second': 0}
@@ -0,0 +1,93 @@
+import gzip
+
+import pytest
+from django.core.management import call_command
+
+from blogicum.staticfiles import StaticFilesApplication, if_none_match
+
+
+@pytest.fixture
+def static_root(tmp_path, settings):
+    settings.STATIC_ROOT = tmp_path
+    call_command('collectstatic', interactive=False, verbosity=0)
+    return tmp_path
+
+
+def fallback(environ, start_response):
+    start_response('404 Not Found', [])
+    return [b'fallback']
+
+
+def request(application, path, **headers):
+    environ = {'PATH_INFO': path, 'REQUEST_METHOD': 'GET', **headers}
+    response = {}
+
+    def start_response(status, response_headers):
+        response['status'] = status
+        response['headers'] = dict(response_headers)
+
+    response['body'] = b''.join(application(environ, start_response))
+    return response
+
+
+def test_collectstatic_precompresses_hashed_files(static_root):
+    hashed = list(static_root.glob('css/bootstrap.min.*.css'))
+    assert hashed, 'Убедитесь, что в имени собранной статики есть хеш.'
+    compressed = hashed[0].with_name(hashed[0].name + '.gz')
+    assert compressed.exists(), (
+        'Убедитесь, что collectstatic создаёт сжатые копии файлов.'
+    )
+    assert gzip.decompress(compressed.read_bytes()) == (
+        hashed[0].read_bytes()
+    )
+    assert not list(static_root.glob('img/logo*.png.gz'))
+
+
+def test_static_application_negotiates_encoding(static_root):
+    application = StaticFilesApplication(fallback)
+    path = '/static/' + next(
+        static_root.glob('css/bootstrap.min.*.css')
+    ).relative_to(static_root).as_posix()
+
+    response = request(application, path, HTTP_ACCEPT_ENCODING='gzip, br')
+    assert response['status'] == '200 OK'
+    assert response['headers']['Content-Encoding'] == 'gzip'
+    assert response['headers']['Content-Type'] == 'text/css'
+    assert 'immutable' in response['headers']['Cache-Control']
+    assert response['body'][:2] == b'\x1f\x8b'
+
+    plain = request(application, path, HTTP_ACCEPT_ENCODING='gzip;q=0')
+    assert 'Content-Encoding' not in plain['headers']
+    assert plain['headers']['ETag'] != response['headers']['ETag']
+
+    cached = request(
+        application, path, HTTP_ACCEPT_ENCODING='gzip',
+        HTTP_IF_NONE_MATCH=response['headers']['ETag'],
+    )
+    assert cached['status'] == '304 Not Modified'
+    assert cached['body'] == b''
+
+    original = request(application, '/static/css/bootstrap.min.css')
+    assert original['headers']['Cache-Control'] == 'no-cache'
+    assert request(application, '/static/../settings.py')['body'] == (
+        b'fallback'
+    )
+
+
+def test_if_none_match_compares_whole_tags():
+    etag = '"abc-1-gzip"'
+    assert if_none_match('"other", W/"abc-1-gzip"', etag)
+    assert if_none_match('*', etag)
+    assert not if_none_match('"abc-1-gzip-old"', etag), (
+        'Убедитесь, что метки If-None-Match сравниваются целиком.'
+    )
+    assert not if_none_match('"x", "abc-1-gzi"', etag)
+
+
+@pytest.mark.django_db
+def test_pages_use_local_stylesheet(client):
+    content = client.get('/').content.decode()
+    assert '/static/css/bootstrap.min' in content, (
+        'Убедитесь, что стили подключаются из собранной статики.'
+    )
+    assert 'cdn.jsdelivr.net' not in content
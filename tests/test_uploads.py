@@ -0,0 +1,77 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+from blog.models import Post
+from blog.uploads import EXIF_ORIENTATION
+
+EXIF_MAKE = 0x010F
+
+
+@pytest.fixture
+def media_root(tmp_path, settings):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def make_photo(size=(64, 32), **exif_tags):
+    exif = Image.Exif()
+    for tag, value in exif_tags.items():
+        exif[int(tag)] = value
+    buffer = BytesIO()
+    Image.new('RGB', size).save(buffer, 'JPEG', exif=exif.tobytes())
+    return SimpleUploadedFile(
+        'photo.jpg', buffer.getvalue(), content_type='image/jpeg'
+    )
+
+
+def post_data(category, image):
+    return {
+        'title': 'Заголовок',
+        'text': 'Текст',
+        'pub_date': '2020-01-01 10:00:00',
+        'category': category.id,
+        'is_published': True,
+        'image': image,
+    }
+
+
+@pytest.mark.django_db
+def test_upload_metadata_is_stripped(
+        media_root, user_client, published_category
+):
+    photo = make_photo(**{
+        str(EXIF_ORIENTATION): 6, str(EXIF_MAKE): 'Secret Camera',
+    })
+    user_client.post('/posts/create/', data=post_data(
+        published_category, photo
+    ))
+    post = Post.objects.get()
+    with Image.open(post.image.path) as image:
+        exif = image.getexif()
+        assert EXIF_MAKE not in exif, (
+            'Убедитесь, что из загруженного изображения удаляются '
+            'метаданные EXIF.'
+        )
+        assert exif.get(EXIF_ORIENTATION) == 6
+        assert image.size == (64, 32)
+
+
+@pytest.mark.django_db
+def test_oversized_upload_is_rejected(
+        media_root, settings, user_client, published_category
+):
+    settings.BLOG_MAX_UPLOAD_SIZE = 512
+    photo = make_photo(size=(400, 400))
+    response = user_client.post('/posts/create/', data=post_data(
+        published_category, photo
+    ))
+    assert response.status_code == 200
+    assert 'image' in response.context['form'].errors, (
+        'Убедитесь, что файл больше BLOG_MAX_UPLOAD_SIZE отклоняется с '
+        'ошибкой формы.'
+    )
+    assert not Post.objects.exists()
+    assert not list(media_root.rglob('*.jpg'))